@@ -1,22 +1,119 @@
+import io
 import os
-from datetime import datetime
-from flask import Flask, render_template_string, redirect, url_for, request, flash
+import re
+import csv
+import atexit
+import sqlite3
+import json
+import queue
+import click
+import time
+import base64
+import hashlib
+import heapq
+import tempfile
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from flask import (Flask, render_template, redirect, url_for, request, flash, jsonify, session,
+                   make_response, Response, stream_with_context, g, has_request_context)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.engine import make_url
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from jinja2 import DictLoader
 
 # --- CONFIGURACIÓN ---
 app = Flask(__name__)
 # En producción, usa una clave secreta robusta guardada en variables de entorno
 app.config['SECRET_KEY'] = 'plasticos-sustentables-secret-key-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///gestion_tareas.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///gestion_tareas.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Pool de conexiones: escritores y lectores concurrentes no se bloquean en WAL.
+# SQLite en memoria usa una única conexión compartida (StaticPool), que no
+# admite estas opciones
+database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+if not (database_url.get_backend_name() == 'sqlite'
+        and (database_url.database in (None, '', ':memory:') or database_url.query.get('mode') == 'memory')):
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': 30,
+    }
+# PRAGMAs aplicados a cada conexión SQLite nueva
+app.config['SQLITE_PRAGMAS'] = {
+    'journal_mode': 'WAL',       # los lectores no esperan al escritor
+    'synchronous': 'NORMAL',     # seguro en WAL, un fsync por checkpoint
+    'busy_timeout': 5000,        # ms esperando el bloqueo antes de "database is locked"
+    'cache_size': -16000,        # ~16 MB de caché de páginas por conexión
+    'temp_store': 'MEMORY',
+}
+# Agrupar los cambios de estado en una sola transacción (opcional)
+app.config['COALESCE_STATUS_WRITES'] = os.environ.get('COALESCE_STATUS_WRITES') == '1'
+app.config['COALESCE_MAX_BATCH'] = 200
+app.config['COALESCE_MAX_DELAY'] = 0.05  # segundos
+# Hash de contraseñas: coste de scrypt y pool de hilos dedicado
+app.config['SCRYPT_N'] = int(os.environ.get('SCRYPT_N', 2 ** 15))
+app.config['SCRYPT_R'] = 8
+app.config['SCRYPT_P'] = 1
+app.config['HASH_WORKERS'] = int(os.environ.get('HASH_WORKERS', 2))
+app.config['HASH_MAX_PENDING'] = 32      # en curso + en cola
+app.config['HASH_QUEUE_TIMEOUT'] = 2.0   # segundos esperando hueco antes de responder 503
+# Caché de páginas del tablero ya renderizadas, por ETag
+app.config['DASHBOARD_PAGE_CACHE'] = True
+app.config['DASHBOARD_PAGE_CACHE_SIZE'] = 256
+app.config['DASHBOARD_PAGE_CACHE_TTL'] = 60  # segundos
+# Exportación: filas leídas por consulta y bytes acumulados antes de enviar
+app.config['EXPORT_CHUNK_SIZE'] = 1000
+app.config['EXPORT_BUFFER_BYTES'] = 64 * 1024
+# Importación CSV: filas por transacción y errores detallados en el informe
+app.config['IMPORT_CHUNK_SIZE'] = 500
+app.config['IMPORT_MAX_ERRORS'] = 1000
+# Registro de peticiones lentas (con sus sentencias SQL); None lo desactiva
+app.config['SLOW_REQUEST_MS'] = float(os.environ['SLOW_REQUEST_MS']) if os.environ.get('SLOW_REQUEST_MS') else None
+app.config['SLOWEST_QUERIES'] = 10
+# Eventos en vivo (SSE): cola por cliente y latido para mantener la conexión
+app.config['SSE_QUEUE_SIZE'] = 100
+app.config['SSE_KEEPALIVE'] = 15  # segundos
+# Cola personal: tareas mostradas y refresco del recuento de vencidas
+app.config['MY_QUEUE_LIMIT'] = 50
+app.config['OVERDUE_REFRESH_SECONDS'] = 60
+# Archivo de tareas completadas (partición fría)
+app.config['ARCHIVE_AFTER_DAYS'] = int(os.environ.get('ARCHIVE_AFTER_DAYS', 90))
+app.config['ARCHIVE_BATCH_SIZE'] = 500
+# Compactación automática desactivada por defecto (None); `flask archive-tasks`
+# la ejecuta a mano. Con ARCHIVE_INTERVAL_SECONDS=3600 pasa a ser horaria
+app.config['ARCHIVE_INTERVAL_SECONDS'] = int(os.environ['ARCHIVE_INTERVAL_SECONDS']) \
+    if os.environ.get('ARCHIVE_INTERVAL_SECONDS') else None
+# Máximo de elementos por petición en la API masiva
+app.config['API_MAX_BATCH'] = 5000
+# Paginación del tablero: tamaño por defecto y máximo permitido vía ?per_page=
+app.config['TASKS_PER_PAGE'] = 24
+app.config['MAX_TASKS_PER_PAGE'] = 96
+# Caché del usuario autenticado (evita un SELECT por petición)
+app.config['USER_CACHE_SIZE'] = 1024
+app.config['USER_CACHE_TTL'] = 300  # segundos
+# Buscador de empleados por prefijo (selector de asignado)
+app.config['USER_SEARCH_LIMIT'] = 10
+app.config['USER_DIRECTORY_SIZE'] = 512
+app.config['USER_DIRECTORY_TTL'] = 60  # segundos
 
 db = SQLAlchemy(app)
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
+@db.event.listens_for(db.Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in app.config['SQLITE_PRAGMAS'].items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
 # --- MODELOS DE BASE DE DATOS ---
 
 class User(UserMixin, db.Model):
@@ -27,6 +124,9 @@ class User(UserMixin, db.Model):
     # Relación para saber qué tareas tiene asignadas este usuario
     tasks = db.relationship('Task', backref='assignee', lazy=True)
 
+TASK_STATUSES = ('Pendiente', 'En Progreso', 'Completada')
+OPEN_STATUSES = ('Pendiente', 'En Progreso')
+
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -40,11 +140,819 @@ class Task(db.Model):
     # Creador de la tarea (opcional, para auditoría)
     created_by = db.Column(db.String(100), nullable=True)
 
+    # Índices compuestos para la paginación por cursor (created_at, id),
+    # con y sin filtro de estado
+    __table_args__ = (
+        db.Index('ix_task_created_at_id', 'created_at', 'id'),
+        db.Index('ix_task_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_task_due_date', 'due_date'),
+        # Cola personal: tareas abiertas de un empleado por fecha de vencimiento
+        db.Index('ix_task_user_status_due_date', 'user_id', 'status', 'due_date'),
+    )
+
+class TaskArchive(db.Model):
+    # Tareas completadas antiguas, fuera de la tabla caliente `task`; id propio
+    # porque SQLite puede reutilizar el id más alto tras borrarlo de `task`
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False, index=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    due_date = db.Column(db.Date, nullable=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_by = db.Column(db.String(100), nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    assignee = db.relationship('User')
+
+    __table_args__ = (
+        db.Index('ix_task_archive_created_at_id', 'created_at', 'id'),
+    )
+
+class TaskCounter(db.Model):
+    # Número de tareas (activas y archivadas) por empleado y estado; lo
+    # mantienen los triggers de COUNTER_TRIGGERS sobre `task` y `task_archive`
+    user_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+class DataVersion(db.Model):
+    # Fila única (id=1) que cuenta las escrituras sobre task y user; la
+    # incrementan los triggers de VERSION_TRIGGERS
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+# --- CACHÉ ---
+
+class TTLCache:
+    """Caché LRU acotada con expiración por tiempo y contadores de aciertos."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'size': len(self._data), 'maxsize': self.maxsize, 'ttl': self.ttl,
+                'hits': self.hits, 'misses': self.misses}
+
 # --- GESTIÓN DE LOGIN ---
 
+# Se guardan las columnas del usuario, no la instancia ORM, que queda
+# ligada (y expirada) a la sesión de la petición que la cargó
+user_cache = TTLCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user_id = int(user_id)
+    columns = user_cache.get(user_id)
+    if columns is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            user_cache.set(user_id, {c.key: getattr(user, c.key) for c in User.__table__.columns})
+        return user
+    # Reconstruir la instancia y unirla a la sesión actual sin consultar
+    user = User(**columns)
+    db.make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+# --- DIRECTORIO DE EMPLEADOS ---
+
+# Resultados de búsqueda por prefijo; se vacía al dar de alta usuarios
+user_directory = TTLCache(app.config['USER_DIRECTORY_SIZE'], app.config['USER_DIRECTORY_TTL'])
+
+def search_users(prefix, limit=None):
+    """Empleados cuyo nombre empieza por `prefix` (distingue mayúsculas),
+    como lista de {'id', 'username'} ordenada por nombre."""
+    limit = limit or app.config['USER_SEARCH_LIMIT']
+    key = (prefix, limit)
+    users = user_directory.get(key)
+    if users is None:
+        # Rango sobre el índice único de username en lugar de LIKE 'x%'
+        query = db.select(User.id, User.username).order_by(User.username).limit(limit)
+        if prefix:
+            query = query.where(User.username >= prefix, User.username < prefix + chr(0x10FFFF))
+        users = [{'id': user_id, 'username': username}
+                 for user_id, username in db.session.execute(query)]
+        user_directory.set(key, users)
+    return users
+
+# --- BÚSQUEDA DE TEXTO COMPLETO (FTS5) ---
+
+# Índice externo sobre task(title, description); los triggers lo mantienen
+# sincronizado con cualquier INSERT/UPDATE/DELETE sobre `task`
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE task_fts USING fts5(
+        title, description, content='task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO task_fts(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+task_fts = db.table('task_fts', db.column('rowid'), db.column('rank'))
+_fts_enabled = None
+
+def fts_enabled():
+    # Se detecta una vez por proceso; sin FTS5 se busca con LIKE
+    global _fts_enabled
+    if _fts_enabled is None:
+        _fts_enabled = db.engine.dialect.name == 'sqlite' and db.session.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE name = 'task_fts'")).first() is not None
+    return _fts_enabled
+
+def init_fts():
+    global _fts_enabled
+    with db.engine.begin() as conn:
+        exists = conn.execute(
+            db.text("SELECT 1 FROM sqlite_master WHERE name = 'task_fts'")).first()
+        if not exists:
+            try:
+                conn.execute(db.text(FTS_SCHEMA[0]))
+            except db.exc.OperationalError:
+                print("FTS5 no disponible: la búsqueda usará LIKE.")
+                _fts_enabled = False
+                return
+        for statement in FTS_SCHEMA[1:]:
+            conn.execute(db.text(statement))
+        if not exists:
+            # Indexar las tareas que ya existían
+            conn.execute(db.text("INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+    _fts_enabled = True
+
+def fts_query(search_query):
+    # Cada palabra como término entre comillas con prefijo: "extru"* "linea"*
+    terms = re.findall(r'\w+', search_query)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def filter_tasks(query, search_query='', status_filter=''):
+    """Aplica los filtros del tablero.
+
+    Devuelve (query, rank): `rank` es la relevancia BM25 cuando la búsqueda
+    usa FTS5 (menor es mejor) o None si no hay búsqueda de texto completo.
+    """
+    rank = None
+    if search_query:
+        match = fts_query(search_query)
+        if match and fts_enabled():
+            query = (query.join(task_fts, task_fts.c.rowid == Task.id)
+                     .filter(db.literal_column('task_fts').op('MATCH')(match)))
+            rank = task_fts.c.rank
+        else:
+            query = query.filter(db.or_(Task.title.contains(search_query, autoescape=True),
+                                        Task.description.contains(search_query, autoescape=True)))
+    if status_filter:
+        query = query.filter(Task.status == status_filter)
+    return query, rank
+
+# --- HASH DE CONTRASEÑAS ---
+
+class HashPoolBusy(Exception):
+    pass
+
+class PasswordHashPool:
+    """Ejecuta scrypt en un pool de hilos acotado.
+
+    hashlib.scrypt libera el GIL, así que como mucho HASH_WORKERS núcleos se
+    dedican a hashear y el resto del tráfico sigue atendido. Si ya hay
+    HASH_MAX_PENDING operaciones pendientes, se espera HASH_QUEUE_TIMEOUT
+    segundos y después se lanza HashPoolBusy (503) en lugar de acumular.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(app.config['HASH_MAX_PENDING'])
+        self._lock = threading.Lock()
+
+    @property
+    def method(self):
+        config = self.app.config
+        return f"scrypt:{config['SCRYPT_N']}:{config['SCRYPT_R']}:{config['SCRYPT_P']}"
+
+    def hash(self, password):
+        return self.hash_async(password).result()
+
+    def hash_async(self, password):
+        # Future con el hash; para quien lanza muchos a la vez (importación)
+        return self.submit(generate_password_hash, password, method=self.method)
+
+    def check(self, password_hash, password):
+        return self.submit(check_password_hash, password_hash, password).result()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(timeout=self.app.config['HASH_QUEUE_TIMEOUT']):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy()
+        with self._lock:
+            self.pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.app.config['HASH_WORKERS'],
+                                                    thread_name_prefix='password-hash')
+        try:
+            future = self._executor.submit(self._timed, fn, *args, **kwargs)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+        self._slots.release()
+
+    def _timed(self, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            latency = time.perf_counter() - started
+            with self._lock:
+                self.completed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+
+    def stats(self):
+        return {
+            'workers': self.app.config['HASH_WORKERS'],
+            'queue_depth': self.pending,
+            'max_pending': self.app.config['HASH_MAX_PENDING'],
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_latency_ms': round(self.total_latency / self.completed * 1000, 2) if self.completed else None,
+            'max_latency_ms': round(self.max_latency * 1000, 2),
+        }
+
+password_hasher = PasswordHashPool(app)
+
+@app.errorhandler(HashPoolBusy)
+def hash_pool_busy(error):
+    return 'Servidor ocupado, inténtalo de nuevo en unos segundos.', 503, {'Retry-After': '1'}
+
+# --- TAREAS PERIÓDICAS ---
+
+class PeriodicJob:
+    """Ejecuta `func` cada `interval` segundos en un hilo de fondo.
+
+    Se arranca con la primera petición (no al importar, para no lanzar
+    hilos en los comandos CLI ni en el proceso padre del recargador).
+    Si el intervalo configurado es None, la tarea queda desactivada.
+    """
+
+    def __init__(self, app, name, interval_key, func):
+        self.app = app
+        self.name = name
+        self.interval_key = interval_key
+        self.func = func
+        self.runs = 0
+        self.last_run = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.app.config[self.interval_key] is None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                self._thread.start()
+
+    def run_once(self):
+        with self.app.app_context():
+            result = self.func()
+        self.runs += 1
+        self.last_run = datetime.utcnow()
+        return result
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception:
+                self.app.logger.exception('Error en la tarea periódica %s', self.name)
+            time.sleep(self.app.config[self.interval_key])
+
+    def stats(self):
+        return {'enabled': self.app.config[self.interval_key] is not None, 'runs': self.runs,
+                'last_run': self.last_run.isoformat() if self.last_run else None}
+
+periodic_jobs = {}
+
+@app.before_request
+def start_periodic_jobs():
+    for job in periodic_jobs.values():
+        job.start()
+
+# --- CONTADORES DE TAREAS ---
+
+COUNTER_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS task_counter_ai AFTER INSERT ON task BEGIN
+        INSERT INTO task_counter(user_id, status, total)
+        VALUES (new.user_id, coalesce(new.status, ''), 1)
+        ON CONFLICT(user_id, status) DO UPDATE SET total = total + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_counter_ad AFTER DELETE ON task BEGIN
+        UPDATE task_counter SET total = total - 1
+        WHERE user_id = old.user_id AND status = coalesce(old.status, '');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS task_counter_au AFTER UPDATE OF status, user_id ON task
+    WHEN old.status IS NOT new.status OR old.user_id IS NOT new.user_id BEGIN
+        UPDATE task_counter SET total = total - 1
+        WHERE user_id = old.user_id AND status = coalesce(old.status, '');
+        INSERT INTO task_counter(user_id, status, total)
+        VALUES (new.user_id, coalesce(new.status, ''), 1)
+        ON CONFLICT(user_id, status) DO UPDATE SET total = total + 1;
+    END""",
+    # Al archivar, el DELETE sobre `task` descuenta y este INSERT vuelve a sumar
+    """CREATE TRIGGER IF NOT EXISTS task_archive_counter_ai AFTER INSERT ON task_archive BEGIN
+        INSERT INTO task_counter(user_id, status, total)
+        VALUES (new.user_id, coalesce(new.status, ''), 1)
+        ON CONFLICT(user_id, status) DO UPDATE SET total = total + 1;
+    END""",
+]
+
+def rebuild_counters():
+    # Recalcula los contadores desde cero (reparación)
+    db.session.execute(db.delete(TaskCounter))
+    db.session.execute(db.text(
+        "INSERT INTO task_counter(user_id, status, total) "
+        "SELECT user_id, coalesce(status, ''), count(*) FROM "
+        "(SELECT user_id, status FROM task UNION ALL SELECT user_id, status FROM task_archive) "
+        "GROUP BY 1, 2"))
+    db.session.commit()
+
+# Vencidas por empleado: dependen de la fecha, no de las escrituras, así que
+# no las pueden mantener los triggers; las precalcula OVERDUE_JOB. La
+# generación cambia cuando cambian las cifras y forma parte del ETag
+overdue_counts = {'by_user': {}, 'total': 0, 'computed_at': None, 'generation': 0}
+
+def refresh_overdue_counts():
+    by_user = dict(db.session.execute(
+        db.select(Task.user_id, db.func.count())
+        .where(Task.due_date < date.today(), Task.status.in_(OPEN_STATUSES))
+        .group_by(Task.user_id)).all())
+    generation = overdue_counts['generation'] + (by_user != overdue_counts['by_user'])
+    overdue_counts.update(by_user=by_user, total=sum(by_user.values()),
+                          computed_at=datetime.utcnow(), generation=generation)
+
+periodic_jobs['overdue'] = PeriodicJob(app, 'overdue-counts', 'OVERDUE_REFRESH_SECONDS',
+                                       refresh_overdue_counts)
+
+def overdue_count(user_id=None):
+    if overdue_counts['computed_at'] is None:
+        refresh_overdue_counts()
+    if user_id is None:
+        return overdue_counts['total']
+    return overdue_counts['by_user'].get(user_id, 0)
+
+def triggers_enabled():
+    # Los triggers de contadores y de versión solo se crean en SQLite
+    return db.engine.dialect.name == 'sqlite'
+
+def task_counters():
+    """Tabla (user_id, status, total): task_counter si la mantienen los
+    triggers; si no, el recuento directo sobre task y task_archive."""
+    if triggers_enabled():
+        return TaskCounter.__table__
+    tasks = db.union_all(db.select(Task.user_id, Task.status),
+                         db.select(TaskArchive.user_id, TaskArchive.status)).subquery()
+    status = db.func.coalesce(tasks.c.status, '')
+    return (db.select(tasks.c.user_id, status.label('status'), db.func.count().label('total'))
+            .group_by(tasks.c.user_id, status).subquery('task_counter'))
+
+def task_summary(user_id=None):
+    """Totales por estado y tareas vencidas, globales o de un empleado."""
+    counters = task_counters()
+    counts = db.select(counters.c.status, db.func.sum(counters.c.total)).group_by(counters.c.status)
+    if user_id is not None:
+        counts = counts.where(counters.c.user_id == user_id)
+    summary = {status: 0 for status in TASK_STATUSES}
+    summary.update({status: total for status, total in db.session.execute(counts) if total})
+    summary['Vencidas'] = overdue_count(user_id)
+    return summary
+
+def task_summary_by_user():
+    counters = task_counters()
+    rows = db.session.execute(
+        db.select(User.id, User.username, counters.c.status, counters.c.total)
+        .join(counters, counters.c.user_id == User.id)
+        .where(counters.c.total > 0))
+    per_user = {}
+    for user_id, username, status, total in rows:
+        entry = per_user.setdefault(user_id, {'user_id': user_id, 'username': username,
+                                              'Vencidas': overdue_count(user_id)})
+        entry[status] = total
+    return list(per_user.values())
+
+def my_queue_tasks(user_id, limit):
+    """Tareas abiertas del empleado, por vencimiento (las sin fecha al final).
+
+    Cada consulta es un recorrido por rango de ix_task_user_status_due_date
+    (empleado, estado, con o sin fecha) con LIMIT; se mezclan en memoria.
+    """
+    dated, undated = [], []
+    for status in OPEN_STATUSES:
+        query = Task.query.filter(Task.user_id == user_id, Task.status == status)
+        dated.append(query.filter(Task.due_date.isnot(None))
+                     .order_by(Task.due_date, Task.id).limit(limit).all())
+        undated.extend(query.filter(Task.due_date.is_(None)).order_by(Task.id).limit(limit).all())
+    tasks = list(heapq.merge(*dated, key=lambda task: (task.due_date, task.id)))
+    tasks += sorted(undated, key=lambda task: task.id)
+    return tasks[:limit]
+
+def parse_due_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+# --- ARCHIVO (PARTICIÓN FRÍA) ---
+
+ARCHIVE_COLUMNS = ('title', 'description', 'status', 'created_at', 'due_date', 'user_id', 'created_by')
+
+def archive_completed_tasks(older_than_days=None):
+    """Mueve las tareas completadas creadas hace más de ARCHIVE_AFTER_DAYS
+    días a `task_archive`, en lotes de ARCHIVE_BATCH_SIZE con una
+    transacción corta cada uno. Devuelve cuántas tareas se archivaron."""
+    days = app.config['ARCHIVE_AFTER_DAYS'] if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    task_table, archive_table = Task.__table__, TaskArchive.__table__
+    moved = 0
+    while True:
+        # Recorrido por rango de ix_task_status_created_at_id
+        ids = db.session.scalars(
+            db.select(Task.id).where(Task.status == 'Completada', Task.created_at < cutoff)
+            .order_by(Task.created_at, Task.id).limit(app.config['ARCHIVE_BATCH_SIZE'])).all()
+        if not ids:
+            return moved
+        source = db.select(task_table.c.id, *(task_table.c[name] for name in ARCHIVE_COLUMNS),
+                           db.literal(datetime.utcnow()).label('archived_at')
+                           ).where(task_table.c.id.in_(ids))
+        db.session.execute(archive_table.insert().from_select(
+            ('task_id',) + ARCHIVE_COLUMNS + ('archived_at',), source))
+        db.session.execute(db.delete(task_table).where(task_table.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+periodic_jobs['archive'] = PeriodicJob(app, 'archive-compaction', 'ARCHIVE_INTERVAL_SECONDS',
+                                       archive_completed_tasks)
+
+def filter_archive(query, search_query='', status_filter=''):
+    # El archivo es frío y poco consultado: basta con LIKE, sin índice FTS
+    if search_query:
+        query = query.filter(db.or_(TaskArchive.title.contains(search_query, autoescape=True),
+                                    TaskArchive.description.contains(search_query, autoescape=True)))
+    if status_filter:
+        query = query.filter(TaskArchive.status == status_filter)
+    return query
+
+# --- EXPORTACIÓN EN STREAMING ---
+
+EXPORT_COLUMNS = ('id', 'title', 'description', 'status', 'assignee',
+                  'created_by', 'created_at', 'due_date')
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+def iter_export_rows(search_query='', status_filter=''):
+    # Recorre las tareas por id en bloques: memoria constante sea cual sea el tamaño
+    stmt = (db.select(Task.id, Task.title, Task.description, Task.status,
+                      User.username.label('assignee'), Task.created_by,
+                      Task.created_at, Task.due_date)
+            .join(User, User.id == Task.user_id))
+    stmt, rank = filter_tasks(stmt, search_query, status_filter)
+    if rank is not None:
+        # Con FTS5 no se repite el MATCH por bloque: un único cursor en orden de
+        # rowid (FTS5 lo entrega ya ordenado, sin B-tree temporal) leído por bloques
+        result = db.session.execute(stmt.order_by(task_fts.c.rowid)
+                                    .execution_options(yield_per=app.config['EXPORT_CHUNK_SIZE']))
+        try:
+            yield from result
+        finally:
+            result.close()
+        return
+    last_id = 0
+    while True:
+        rows = db.session.execute(stmt.where(Task.id > last_id).order_by(Task.id)
+                                  .limit(app.config['EXPORT_CHUNK_SIZE'])).all()
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1].id
+
+def export_value(value):
+    return value.isoformat() if isinstance(value, (datetime, date)) else value
+
+def iter_export(rows, export_format):
+    """Serializa filas a CSV o NDJSON en trozos de EXPORT_BUFFER_BYTES."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        values = [export_value(value) for value in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False) + '\n')
+        if buffer.tell() >= app.config['EXPORT_BUFFER_BYTES']:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+# --- IMPORTACIÓN MASIVA (CSV) ---
+
+IMPORT_KINDS = ('users', 'tasks')
+
+def chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def csv_rows(text_stream):
+    # (número de línea, fila) de un CSV con cabecera
+    reader = csv.DictReader(text_stream)
+    for row in reader:
+        yield reader.line_num, {key: (value or '').strip() for key, value in row.items() if key}
+
+def validate_user_row(row):
+    if not row.get('username') or len(row['username']) > 100:
+        return 'username vacío o demasiado largo'
+    if '@' not in row.get('email', '') or len(row['email']) > 100:
+        return 'email inválido'
+    if not row.get('password'):
+        return 'password vacío'
+    return None
+
+def validate_task_row(row):
+    if not row.get('title') or len(row['title']) > 200:
+        return 'title vacío o demasiado largo'
+    if not row.get('assignee'):
+        return 'assignee vacío'
+    if row.get('status') and row['status'] not in TASK_STATUSES:
+        return 'status inválido'
+    if row.get('due_date'):
+        try:
+            date.fromisoformat(row['due_date'])
+        except ValueError:
+            return 'due_date no es AAAA-MM-DD'
+    return None
+
+def import_csv(kind, rows, created_by=None):
+    """Importa usuarios o tareas en transacciones de IMPORT_CHUNK_SIZE filas.
+
+    Las filas inválidas se saltan y se anotan con su número de línea sin
+    abortar el resto. Genera un dict de progreso por bloque; el último
+    incluye `done` y la lista de errores.
+    """
+    report = {'processed': 0, 'imported': 0, 'skipped': 0, 'errors': []}
+
+    def reject(line, error):
+        report['skipped'] += 1
+        if len(report['errors']) < app.config['IMPORT_MAX_ERRORS']:
+            report['errors'].append({'line': line, 'error': error})
+
+    seen = set()
+    assignees = {}
+    for chunk in chunked(rows, app.config['IMPORT_CHUNK_SIZE']):
+        report['processed'] += len(chunk)
+        if kind == 'users':
+            valid = import_users_chunk(chunk, seen, reject)
+        else:
+            valid = import_tasks_chunk(chunk, assignees, created_by, reject)
+        if valid:
+            try:
+                db.session.execute(db.insert(User if kind == 'users' else Task), [row for _, row in valid])
+                db.session.commit()
+                if kind == 'users':
+                    user_directory.clear()
+                report['imported'] += len(valid)
+            except db.exc.IntegrityError as error:
+                db.session.rollback()
+                # Solo las filas que iban en el INSERT; las demás ya constan
+                for line, _ in valid:
+                    reject(line, f'bloque descartado: {error.orig}')
+        yield {key: value for key, value in report.items() if key != 'errors'}
+    report['errors'].sort(key=lambda error: error['line'])
+    yield dict(report, done=True)
+
+def import_users_chunk(chunk, seen, reject):
+    candidates = []
+    for line, row in chunk:
+        error = validate_user_row(row)
+        if not error and (row['username'] in seen or row['email'] in seen):
+            error = 'usuario o email repetido en el fichero'
+        if error:
+            reject(line, error)
+            continue
+        seen.update((row['username'], row['email']))
+        candidates.append((line, row))
+
+    # Usuarios ya existentes: una consulta por bloque
+    names = [row['username'] for _, row in candidates]
+    emails = [row['email'] for _, row in candidates]
+    taken = set(db.session.scalars(db.select(User.username).where(User.username.in_(names))))
+    taken.update(db.session.scalars(db.select(User.email).where(User.email.in_(emails))))
+    valid = []
+    for line, row in candidates:
+        if row['username'] in taken or row['email'] in taken:
+            reject(line, 'usuario o email ya registrado')
+        else:
+            valid.append((line, row))
+
+    # Los hashes van directos al pool de scrypt, con como mucho HASH_WORKERS
+    # en vuelo para no quitar huecos a los logins; si el pool está saturado,
+    # la fila se omite en lugar de abortar la importación
+    hashed, in_flight = [], deque()
+
+    def collect():
+        (line, row), future = in_flight.popleft()
+        hashed.append((line, {'username': row['username'], 'email': row['email'],
+                              'password_hash': future.result()}))
+
+    for line, row in valid:
+        if len(in_flight) >= app.config['HASH_WORKERS']:
+            collect()
+        try:
+            in_flight.append(((line, row), password_hasher.hash_async(row['password'])))
+        except HashPoolBusy:
+            reject(line, 'servidor ocupado calculando contraseñas; reintenta esta fila')
+    while in_flight:
+        collect()
+    return hashed
+
+def import_tasks_chunk(chunk, assignees, created_by, reject):
+    candidates = []
+    for line, row in chunk:
+        error = validate_task_row(row)
+        if error:
+            reject(line, error)
+        else:
+            candidates.append((line, row))
+
+    # Resolver los nombres de usuario nuevos de este bloque en una consulta
+    missing = {row['assignee'] for _, row in candidates} - assignees.keys()
+    if missing:
+        assignees.update(db.session.execute(
+            db.select(User.username, User.id).where(User.username.in_(missing))).all())
+    valid = []
+    for line, row in candidates:
+        user_id = assignees.get(row['assignee'])
+        if user_id is None:
+            reject(line, f"empleado inexistente: {row['assignee']}")
+            continue
+        valid.append((line, {'title': row['title'], 'description': row.get('description') or None,
+                             'status': row.get('status') or 'Pendiente', 'user_id': user_id,
+                             'due_date': date.fromisoformat(row['due_date']) if row.get('due_date') else None,
+                             'created_by': created_by}))
+    return valid
+
+# --- VERSIÓN DE LOS DATOS (ETag) ---
+
+def version_trigger(table, event):
+    name = f"{table}_version_{event.split()[0].lower()}"
+    return f"""CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON "{table}" BEGIN
+        UPDATE data_version SET version = version + 1 WHERE id = 1;
+    END"""
+
+VERSION_TRIGGERS = [
+    version_trigger('task', 'INSERT'),
+    version_trigger('task', 'UPDATE'),
+    version_trigger('task', 'DELETE'),
+    version_trigger('user', 'INSERT'),
+    version_trigger('user', 'UPDATE OF username'),
+    version_trigger('user', 'DELETE'),
+]
+
+def data_version():
+    return db.session.scalar(db.select(DataVersion.version).where(DataVersion.id == 1)) or 0
+
+def dashboard_etag():
+    # Depende de los datos, del usuario, de los filtros, del día y de la
+    # última actualización de las vencidas
+    if overdue_counts['computed_at'] is None:
+        refresh_overdue_counts()
+    key = json.dumps([data_version(), current_user.id, date.today().isoformat(),
+                      overdue_counts['generation'], sorted(request.args.items(multi=True))])
+    return hashlib.sha1(key.encode()).hexdigest()
+
+page_cache = TTLCache(app.config['DASHBOARD_PAGE_CACHE_SIZE'], app.config['DASHBOARD_PAGE_CACHE_TTL'])
+
+# --- PAGINACIÓN POR CURSOR ---
+
+def encode_cursor(values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, by_rank=False):
+    # Devuelve (created_at o rank, id) o None si el cursor no es válido
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        sort_value, task_id = json.loads(raw)
+        if by_rank:
+            return float(sort_value), int(task_id)
+        return datetime.fromisoformat(sort_value), int(task_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+def paginate_tasks(query, per_page, after=None, before=None, rank=None, model=Task):
+    """Pagina sin OFFSET por (created_at, id) descendente o, si se pasa
+    `rank`, por relevancia (rank, id) ascendente. `model` permite paginar
+    igual el archivo (TaskArchive).
+
+    `after` avanza a la página siguiente y `before` retrocede a la anterior.
+    Devuelve (tareas, cursor_siguiente, cursor_anterior).
+    """
+    by_rank = rank is not None
+    if by_rank:
+        sort_column = rank
+        query = query.add_columns(rank)
+        forward = (rank.asc(), model.id.asc())
+        backward = (rank.desc(), model.id.desc())
+    else:
+        sort_column = model.created_at
+        forward = (model.created_at.desc(), model.id.desc())
+        backward = (model.created_at.asc(), model.id.asc())
+    key = db.tuple_(sort_column, model.id)
+    after_key = decode_cursor(after, by_rank) if after else None
+    before_key = decode_cursor(before, by_rank) if before and not after_key else None
+
+    if before_key:
+        # Se recorre en sentido inverso desde el cursor y luego se invierte
+        rows = (query.filter(key < before_key if by_rank else key > before_key)
+                .order_by(*backward).limit(per_page + 1).all())
+        has_prev = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after_key:
+            query = query.filter(key > after_key if by_rank else key < after_key)
+        rows = query.order_by(*forward).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        has_prev = after_key is not None
+
+    if by_rank:
+        keys = [(row_rank, task.id) for task, row_rank in rows]
+        tasks = [task for task, _ in rows]
+    else:
+        keys = [(task.created_at, task.id) for task in rows]
+        tasks = rows
+    next_cursor = encode_cursor(keys[-1]) if keys and has_next else None
+    prev_cursor = encode_cursor(keys[0]) if keys and has_prev else None
+    return tasks, next_cursor, prev_cursor
 
 # --- PLANTILLAS HTML (Incrustadas para un solo archivo) ---
 
@@ -77,6 +985,7 @@ base_template = """
                 <ul class="navbar-nav ms-auto">
                     {% if current_user.is_authenticated %}
                         <li class="nav-item"><a class="nav-link" href="{{ url_for('dashboard') }}">Tablero</a></li>
+                        <li class="nav-item"><a class="nav-link" href="{{ url_for('my_queue') }}">Mi Cola</a></li>
                         <li class="nav-item"><a class="nav-link" href="{{ url_for('profile') }}">Mi Perfil</a></li>
                         <li class="nav-item"><a class="nav-link text-danger" href="{{ url_for('logout') }}">Cerrar Sesión</a></li>
                     {% else %}
@@ -172,67 +1081,185 @@ dashboard_template = """
     <button class="btn btn-primary" data-bs-toggle="modal" data-bs-target="#addTaskModal">+ Nueva Tarea</button>
 </div>
 
+<!-- Resumen -->
+<div class="row g-3 mb-4">
+    {% for title, counts in [('Todas las tareas', summary), ('Mis tareas', my_summary)] %}
+    <div class="col-md-6">
+        <div class="card p-3">
+            <h6 class="text-muted mb-2">{{ title }}</h6>
+            <div class="d-flex gap-3">
+                <span>Pendientes: <strong>{{ counts['Pendiente'] }}</strong></span>
+                <span>En progreso: <strong>{{ counts['En Progreso'] }}</strong></span>
+                <span>Completadas: <strong>{{ counts['Completada'] }}</strong></span>
+                <span class="text-danger">Vencidas: <strong>{{ counts['Vencidas'] }}</strong></span>
+            </div>
+        </div>
+    </div>
+    {% endfor %}
+</div>
+
 <!-- Filtros -->
 <div class="card p-3 mb-4 bg-light">
     <form method="GET" class="row g-3">
         <div class="col-md-4">
             <input type="text" name="search" class="form-control" placeholder="Buscar tarea..." value="{{ search_query }}">
         </div>
-        <div class="col-md-3">
+        <div class="col-md-2">
             <select name="status" class="form-select">
                 <option value="">Todos los estados</option>
                 <option value="Pendiente" {% if status_filter == 'Pendiente' %}selected{% endif %}>Pendiente</option>
                 <option value="Completada" {% if status_filter == 'Completada' %}selected{% endif %}>Completada</option>
             </select>
         </div>
+        <div class="col-md-2">
+            <select name="per_page" class="form-select">
+                {% for size in [12, 24, 48, 96] %}
+                    <option value="{{ size }}" {% if per_page == size %}selected{% endif %}>{{ size }} por página</option>
+                {% endfor %}
+            </select>
+        </div>
         <div class="col-md-2">
             <button type="submit" class="btn btn-secondary w-100">Filtrar</button>
         </div>
         <div class="col-md-2">
             <a href="{{ url_for('dashboard') }}" class="btn btn-outline-secondary w-100">Limpiar</a>
         </div>
+        <div class="col-12">
+            <div class="form-check">
+                <input class="form-check-input" type="checkbox" name="archive" value="1" id="include-archive" {% if include_archive %}checked{% endif %}>
+                <label class="form-check-label" for="include-archive">Incluir tareas archivadas</label>
+            </div>
+        </div>
     </form>
 </div>
 
-<div class="row">
+<div class="row" id="task-board" data-status-filter="{{ status_filter }}"
+     data-live-insert="{{ 1 if not (search_query or status_filter or prev_cursor) else 0 }}">
     {% for task in tasks %}
+    {% include 'task_card' %}
+    {% else %}
+    <div class="col-12 text-center py-5" id="no-tasks">
+        <h4 class="text-muted">No se encontraron tareas.</h4>
+    </div>
+    {% endfor %}
+</div>
+
+<!-- Paginación -->
+{% if prev_cursor or next_cursor %}
+<nav class="d-flex justify-content-between mb-4">
+    {% if prev_cursor %}
+        <a class="btn btn-outline-secondary" href="{{ url_for('dashboard', search=search_query or None, status=status_filter or None, per_page=per_page, archive=1 if include_archive else None, before=prev_cursor) }}">&larr; Anteriores</a>
+    {% else %}<span></span>{% endif %}
+    {% if next_cursor %}
+        <a class="btn btn-outline-secondary" href="{{ url_for('dashboard', search=search_query or None, status=status_filter or None, per_page=per_page, archive=1 if include_archive else None, after=next_cursor) }}">Siguientes &rarr;</a>
+    {% endif %}
+</nav>
+{% endif %}
+
+<!-- Archivo (solo lectura) -->
+{% if include_archive %}
+<h4 class="mt-2 mb-3 text-muted">Archivo</h4>
+<div class="row">
+    {% for task in archived %}
     <div class="col-md-6 col-lg-4 mb-4">
-        <div class="card card-task h-100 status-{{ task.status }}">
+        <div class="card h-100 bg-light">
             <div class="card-body">
-                <div class="d-flex justify-content-between">
-                    <h5 class="card-title">{{ task.title }}</h5>
-                    <span class="badge {% if task.status == 'Completada' %}bg-success{% else %}bg-warning{% endif %}">
-                        {{ task.status }}
-                    </span>
-                </div>
+                <h5 class="card-title text-muted">{{ task.title }}</h5>
                 <p class="card-text text-muted small">Asignado a: <strong>{{ task.assignee.username }}</strong></p>
                 <p class="card-text">{{ task.description }}</p>
-                
-                <div class="mt-3">
-                    <!-- Acciones Rápidas -->
-                    <form action="{{ url_for('update_task_status', task_id=task.id) }}" method="POST" class="d-inline">
-                        {% if task.status != 'Completada' %}
-                            <button name="status" value="Completada" class="btn btn-sm btn-outline-success">✓</button>
-                        {% else %}
-                            <button name="status" value="Pendiente" class="btn btn-sm btn-outline-warning">↺</button>
-                        {% endif %}
-                    </form>
-                    
-                    <a href="{{ url_for('edit_task', task_id=task.id) }}" class="btn btn-sm btn-outline-primary">Editar</a>
-                    <a href="{{ url_for('delete_task', task_id=task.id) }}" class="btn btn-sm btn-outline-danger" onclick="return confirm('¿Eliminar tarea?')">Eliminar</a>
-                </div>
             </div>
             <div class="card-footer text-muted small">
-                Creado por: {{ task.created_by }}
+                Creado por: {{ task.created_by }} · Archivada el {{ task.archived_at.strftime('%d/%m/%Y') }}
             </div>
         </div>
     </div>
     {% else %}
-    <div class="col-12 text-center py-5">
-        <h4 class="text-muted">No se encontraron tareas.</h4>
-    </div>
+    <div class="col-12 text-muted mb-4">Sin coincidencias en el archivo.</div>
     {% endfor %}
 </div>
+{% if archive_prev or archive_next %}
+<nav class="d-flex justify-content-between mb-4">
+    {% if archive_prev %}
+        <a class="btn btn-outline-secondary btn-sm" href="{{ url_for('dashboard', search=search_query or None, status=status_filter or None, per_page=per_page, archive=1, archive_before=archive_prev) }}">&larr; Archivo: anteriores</a>
+    {% else %}<span></span>{% endif %}
+    {% if archive_next %}
+        <a class="btn btn-outline-secondary btn-sm" href="{{ url_for('dashboard', search=search_query or None, status=status_filter or None, per_page=per_page, archive=1, archive_after=archive_next) }}">Archivo: siguientes &rarr;</a>
+    {% endif %}
+</nav>
+{% endif %}
+{% endif %}
+
+<!-- Cambios de estado y actualizaciones en vivo (SSE): se parchea solo la tarjeta afectada -->
+<script>
+(function () {
+    const board = document.getElementById('task-board');
+    const cardUrl = id => "{{ url_for('task_card', task_id=0) }}".replace('/0/', '/' + id + '/');
+    // Cambios de estado hechos desde esta pestaña: su tarjeta ya llegó en la respuesta
+    const ownToggles = new Map();
+
+    // ✓ / ↺: POST que devuelve solo la tarjeta actualizada, sin recargar
+    board.addEventListener('submit', e => {
+        const form = e.target;
+        if (!form.classList.contains('status-form') || !e.submitter) return;
+        e.preventDefault();
+        const taskId = form.closest('[id^="task-"]').id.slice('task-'.length);
+        ownToggles.set(taskId, e.submitter.value);
+        fetch(form.action, {
+            method: 'POST',
+            headers: {'X-Fragment': 'card'},
+            body: new URLSearchParams({status: e.submitter.value}),
+        }).then(r => r.ok ? r.text() : Promise.reject(r)).then(html => {
+            const tpl = document.createElement('template');
+            tpl.innerHTML = html.trim();
+            const card = tpl.content.firstChild;
+            const existing = form.closest('[id^="task-"]');
+            if (board.dataset.statusFilter && card.dataset.status !== board.dataset.statusFilter) existing.remove();
+            else existing.replaceWith(card);
+        }).catch(() => {
+            ownToggles.delete(taskId);
+            // Sin fragmento: envío clásico conservando el botón pulsado
+            form.append(Object.assign(document.createElement('input'),
+                                      {type: 'hidden', name: 'status', value: e.submitter.value}));
+            form.submit();
+        });
+    });
+
+    function removeCard(id) {
+        const card = document.getElementById('task-' + id);
+        if (card) card.remove();
+    }
+    function patchCard(id, insert) {
+        fetch(cardUrl(id)).then(r => r.ok ? r.text() : null).then(html => {
+            if (!html) return;
+            const tpl = document.createElement('template');
+            tpl.innerHTML = html.trim();
+            const existing = document.getElementById('task-' + id);
+            if (existing) {
+                existing.replaceWith(tpl.content.firstChild);
+            } else if (insert) {
+                board.prepend(tpl.content.firstChild);
+                document.getElementById('no-tasks')?.remove();
+            }
+        });
+    }
+
+    if (!window.EventSource) return;
+    const source = new EventSource("{{ url_for('task_events') }}");
+    source.addEventListener('task-created', e => {
+        if (board.dataset.liveInsert === '1') patchCard(JSON.parse(e.data).id, true);
+    });
+    source.addEventListener('task-changed', e => {
+        const task = JSON.parse(e.data);
+        const own = ownToggles.get(String(task.id)) === task.status;
+        ownToggles.delete(String(task.id));
+        if (board.dataset.statusFilter && task.status !== board.dataset.statusFilter) removeCard(task.id);
+        else if (!own) patchCard(task.id, false);
+    });
+    source.addEventListener('task-deleted', e => removeCard(JSON.parse(e.data).id));
+    // Se perdieron eventos (cola llena): recargar la página completa
+    source.addEventListener('resync', () => window.location.reload());
+})();
+</script>
 
 <!-- Modal Nueva Tarea -->
 <div class="modal fade" id="addTaskModal" tabindex="-1">
@@ -253,12 +1280,15 @@ dashboard_template = """
                         <textarea name="description" class="form-control" rows="3"></textarea>
                     </div>
                     <div class="mb-3">
+                        <label>Fecha de vencimiento</label>
+                        <input type="date" name="due_date" class="form-control">
+                    </div>
+                    <div class="mb-3 position-relative">
                         <label>Asignar a Empleado</label>
-                        <select name="user_id" class="form-select">
-                            {% for user in all_users %}
-                                <option value="{{ user.id }}" {% if user.id == current_user.id %}selected{% endif %}>{{ user.username }}</option>
-                            {% endfor %}
-                        </select>
+                        <input type="text" id="assignee-search" class="form-control" autocomplete="off"
+                               value="{{ current_user.username }}" placeholder="Escribe el nombre del empleado">
+                        <input type="hidden" name="user_id" id="assignee-id" value="{{ current_user.id }}">
+                        <div id="assignee-options" class="list-group position-absolute w-100 shadow-sm" style="z-index: 1060;"></div>
                     </div>
                 </div>
                 <div class="modal-footer">
@@ -269,9 +1299,90 @@ dashboard_template = """
         </div>
     </div>
 </div>
+
+<!-- Selector de asignado: búsqueda por prefijo en lugar de listar a todos -->
+<script>
+(function () {
+    const input = document.getElementById('assignee-search');
+    const hidden = document.getElementById('assignee-id');
+    const options = document.getElementById('assignee-options');
+    let timer = null;
+
+    function choose(user) {
+        input.value = user.username;
+        hidden.value = user.id;
+        options.replaceChildren();
+    }
+    input.addEventListener('input', () => {
+        hidden.value = '';
+        clearTimeout(timer);
+        timer = setTimeout(() => {
+            const url = "{{ url_for('api_users') }}?q=" + encodeURIComponent(input.value);
+            fetch(url).then(r => r.ok ? r.json() : {users: []}).then(data => {
+                options.replaceChildren(...data.users.map(user => {
+                    const item = document.createElement('button');
+                    item.type = 'button';
+                    item.className = 'list-group-item list-group-item-action';
+                    item.textContent = user.username;
+                    item.addEventListener('click', () => choose(user));
+                    return item;
+                }));
+                const exact = data.users.find(user => user.username === input.value);
+                if (exact) hidden.value = exact.id;
+            });
+        }, 150);
+    });
+    input.form.addEventListener('submit', e => {
+        if (!hidden.value) {
+            e.preventDefault();
+            input.classList.add('is-invalid');
+            input.focus();
+        }
+    });
+})();
+</script>
 {% endblock %}
 """
 
+task_card_template = """
+<div class="col-md-6 col-lg-4 mb-4" id="task-{{ task.id }}" data-status="{{ task.status }}">
+    <div class="card card-task h-100 status-{{ task.status }}">
+        <div class="card-body">
+            <div class="d-flex justify-content-between">
+                <h5 class="card-title">{{ task.title }}</h5>
+                <span class="badge {% if task.status == 'Completada' %}bg-success{% else %}bg-warning{% endif %}">
+                    {{ task.status }}
+                </span>
+            </div>
+            <p class="card-text text-muted small">Asignado a: <strong>{{ task.assignee.username }}</strong></p>
+            {% if task.due_date %}
+            <p class="card-text small {% if task.status != 'Completada' and task.due_date < today() %}text-danger fw-bold{% else %}text-muted{% endif %}">
+                Vence: {{ task.due_date.strftime('%d/%m/%Y') }}
+            </p>
+            {% endif %}
+            <p class="card-text">{{ task.description }}</p>
+            
+            <div class="mt-3">
+                <!-- Acciones Rápidas -->
+                <form action="{{ url_for('update_task_status', task_id=task.id) }}" method="POST" class="d-inline status-form">
+                    {% if task.status != 'Completada' %}
+                        <button name="status" value="Completada" class="btn btn-sm btn-outline-success">✓</button>
+                    {% else %}
+                        <button name="status" value="Pendiente" class="btn btn-sm btn-outline-warning">↺</button>
+                    {% endif %}
+                </form>
+                
+                <a href="{{ url_for('edit_task', task_id=task.id) }}" class="btn btn-sm btn-outline-primary">Editar</a>
+                <a href="{{ url_for('delete_task', task_id=task.id) }}" class="btn btn-sm btn-outline-danger" onclick="return confirm('¿Eliminar tarea?')">Eliminar</a>
+            </div>
+        </div>
+        <div class="card-footer text-muted small">
+            Creado por: {{ task.created_by }}
+        </div>
+    </div>
+</div>
+"""
+
 edit_task_template = """
 {% extends "base" %}
 {% block content %}
@@ -289,6 +1400,10 @@ edit_task_template = """
                         <label>Descripción</label>
                         <textarea name="description" class="form-control" rows="3">{{ task.description }}</textarea>
                     </div>
+                    <div class="mb-3">
+                        <label>Fecha de vencimiento</label>
+                        <input type="date" name="due_date" class="form-control" value="{{ task.due_date.isoformat() if task.due_date else '' }}">
+                    </div>
                     <div class="mb-3">
                         <label>Estado</label>
                         <select name="status" class="form-select">
@@ -306,6 +1421,42 @@ edit_task_template = """
 {% endblock %}
 """
 
+my_queue_template = """
+{% extends "base" %}
+{% block content %}
+<div class="d-flex justify-content-between align-items-center mb-4">
+    <h2>Mi Cola de Trabajo</h2>
+    <span class="badge bg-danger fs-6">Vencidas: {{ overdue }}</span>
+</div>
+<div class="list-group">
+    {% for task in tasks %}
+    {% set is_overdue = task.due_date and task.due_date < today() %}
+    <div class="list-group-item d-flex justify-content-between align-items-center {% if is_overdue %}list-group-item-danger{% endif %}">
+        <div>
+            <strong>{{ task.title }}</strong>
+            <span class="badge bg-warning text-dark ms-2">{{ task.status }}</span>
+            {% if task.description %}<div class="small text-muted">{{ task.description }}</div>{% endif %}
+        </div>
+        <div class="text-end">
+            {% if task.due_date %}
+                <div class="small {% if is_overdue %}fw-bold{% endif %}">
+                    {% if is_overdue %}Vencida: {% else %}Vence: {% endif %}{{ task.due_date.strftime('%d/%m/%Y') }}
+                </div>
+            {% else %}
+                <div class="small text-muted">Sin fecha</div>
+            {% endif %}
+            <a href="{{ url_for('edit_task', task_id=task.id) }}" class="btn btn-sm btn-outline-primary mt-1">Editar</a>
+        </div>
+    </div>
+    {% else %}
+    <div class="text-center py-5">
+        <h4 class="text-muted">No tienes tareas pendientes.</h4>
+    </div>
+    {% endfor %}
+</div>
+{% endblock %}
+"""
+
 profile_template = """
 {% extends "base" %}
 {% block content %}
@@ -329,6 +1480,303 @@ profile_template = """
 {% endblock %}
 """
 
+# Registro de plantillas: `{% extends "base" %}` se resuelve con un loader
+# real y cada plantilla se compila una sola vez al arrancar (Jinja la cachea)
+TEMPLATES = {
+    'base': base_template,
+    'login': login_template,
+    'register': register_template,
+    'dashboard': dashboard_template,
+    'task_card': task_card_template,
+    'edit_task': edit_task_template,
+    'my_queue': my_queue_template,
+    'profile': profile_template,
+}
+app.jinja_loader = DictLoader(TEMPLATES)
+# Los nombres no llevan extensión .html, así que Flask no activaría el
+# autoescapado por sí solo (render_template_string sí lo hacía)
+app.jinja_env.autoescape = True
+app.jinja_env.globals['today'] = date.today
+for template_name in TEMPLATES:
+    app.jinja_env.get_template(template_name)
+
+# --- ESCRITURAS AGRUPADAS ---
+
+def apply_status_changes(changes):
+    # Un único UPDATE ejecutado en lote (executemany) para pares (id, estado)
+    stmt = (db.update(Task.__table__)
+            .where(Task.__table__.c.id == db.bindparam('task_id'))
+            .values(status=db.bindparam('new_status')))
+    db.session.execute(stmt, [{'task_id': task_id, 'new_status': status}
+                              for task_id, status in changes])
+
+class StatusWriteCoalescer:
+    """Agrupa los cambios de estado en una transacción por lote.
+
+    Un hilo de fondo espera hasta COALESCE_MAX_DELAY segundos (o hasta
+    COALESCE_MAX_BATCH cambios) y los aplica con un único UPDATE ejecutado
+    en lote. Si una tarea cambia varias veces dentro del lote, gana el último.
+    Un lote que falla vuelve a la cola y se reintenta en la siguiente vuelta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.batches = 0
+        self.writes = 0
+        self.failures = 0
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, task_id, status):
+        with self._cond:
+            self._pending[task_id] = status
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='status-writes', daemon=True)
+                self._thread.start()
+            # Despertar al hilo con el primer cambio (arranca la espera de
+            # COALESCE_MAX_DELAY) y al completar un lote
+            if len(self._pending) == 1 or len(self._pending) >= self.app.config['COALESCE_MAX_BATCH']:
+                self._cond.notify()
+
+    def flush(self):
+        with self._cond:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        with self.app.app_context():
+            try:
+                apply_status_changes(batch.items())
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                with self._cond:
+                    # Sin pisar los cambios que llegaron mientras tanto
+                    for task_id, status in batch.items():
+                        self._pending.setdefault(task_id, status)
+                    self.failures += 1
+                raise
+        for task_id, status in batch.items():
+            publish_task_event('task-changed', task_id, status)
+        self.batches += 1
+        self.writes += len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                self._cond.wait_for(
+                    lambda: len(self._pending) >= self.app.config['COALESCE_MAX_BATCH'],
+                    timeout=self.app.config['COALESCE_MAX_DELAY'])
+            try:
+                self.flush()
+            except Exception:
+                self.app.logger.exception('Error aplicando un lote de cambios de estado')
+                time.sleep(self.app.config['COALESCE_MAX_DELAY'])
+
+    def stats(self):
+        return {'pending': len(self._pending), 'batches': self.batches, 'writes': self.writes,
+                'failures': self.failures}
+
+status_writes = StatusWriteCoalescer(app)
+atexit.register(status_writes.flush)
+
+# --- EVENTOS EN VIVO (SSE) ---
+
+class EventHub:
+    """Pub/sub en proceso con una cola acotada por cliente.
+
+    Un cliente lento no frena a los escritores: si su cola se llena se
+    vacía y recibe un único evento `resync` para que recargue la página.
+    Solo reparte eventos dentro de este proceso.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.published = 0
+        self.resyncs = 0
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = queue.Queue(self.app.config['SSE_QUEUE_SIZE'])
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data):
+        message = f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                with subscriber.mutex:
+                    subscriber.queue.clear()
+                subscriber.put_nowait('event: resync\ndata: {}\n\n')
+                self.resyncs += 1
+
+    def stream(self, subscriber):
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    yield subscriber.get(timeout=self.app.config['SSE_KEEPALIVE'])
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self):
+        return {'clients': len(self._subscribers), 'published': self.published,
+                'resyncs': self.resyncs}
+
+events = EventHub(app)
+
+def publish_task_event(event, task_id, status=None):
+    events.publish(event, {'id': task_id, 'status': status})
+
+# --- INSTRUMENTACIÓN ---
+
+slow_request_log = logging.getLogger('gestion_tareas.slow_requests')
+
+class Metrics:
+    """Latencia por ruta y SQL por petición, en formato de texto de Prometheus."""
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+    def __init__(self, app):
+        self.app = app
+        self.requests = {}        # (ruta, método, código) -> peticiones
+        self.latency = {}         # (ruta, método) -> histograma de segundos
+        self.queries = {}         # (ruta, método) -> histograma de sentencias
+        self.sql_seconds = {}     # (ruta, método) -> segundos de SQL
+        self.slowest = []         # [(segundos, sentencia)] de mayor a menor
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _observe(histograms, key, buckets, value):
+        counts = histograms.setdefault(key, {'buckets': [0] * len(buckets), 'sum': 0, 'count': 0})
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                counts['buckets'][i] += 1
+        counts['sum'] += value
+        counts['count'] += 1
+
+    def observe_request(self, route, method, status, seconds, sql_count, sql_seconds):
+        key = (route, method)
+        with self._lock:
+            self.requests[key + (status,)] = self.requests.get(key + (status,), 0) + 1
+            self._observe(self.latency, key, self.LATENCY_BUCKETS, seconds)
+            self._observe(self.queries, key, self.QUERY_BUCKETS, sql_count)
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + sql_seconds
+
+    def observe_query(self, statement, seconds):
+        limit = self.app.config['SLOWEST_QUERIES']
+        if len(self.slowest) >= limit and seconds <= self.slowest[-1][0]:
+            return
+        statement = ' '.join(statement.split())[:300]
+        with self._lock:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[limit:]
+
+    def render(self, gauges):
+        lines = []
+
+        def label(**labels):
+            escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+                       for v in labels.values())
+            return '{' + ','.join(f'{k}="{v}"' for k, v in zip(labels, escaped)) + '}'
+
+        def histogram(name, help_text, histograms, buckets):
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} histogram'])
+            for (route, method), h in sorted(histograms.items()):
+                for bound, count in zip(buckets, h['buckets']):
+                    lines.append(f"{name}_bucket{label(route=route, method=method, le=bound)} {count}")
+                lines.append(f"{name}_bucket{label(route=route, method=method, le='+Inf')} {h['count']}")
+                lines.append(f"{name}_sum{label(route=route, method=method)} {h['sum']}")
+                lines.append(f"{name}_count{label(route=route, method=method)} {h['count']}")
+
+        with self._lock:
+            lines.extend(['# HELP app_requests_total Peticiones atendidas.',
+                          '# TYPE app_requests_total counter'])
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f"app_requests_total{label(route=route, method=method, status=status)} {count}")
+            histogram('app_request_duration_seconds', 'Latencia de la petición.',
+                      self.latency, self.LATENCY_BUCKETS)
+            histogram('app_sql_queries_per_request', 'Sentencias SQL por petición.',
+                      self.queries, self.QUERY_BUCKETS)
+            lines.extend(['# HELP app_sql_seconds_total Tiempo total en SQL por ruta.',
+                          '# TYPE app_sql_seconds_total counter'])
+            for (route, method), seconds in sorted(self.sql_seconds.items()):
+                lines.append(f"app_sql_seconds_total{label(route=route, method=method)} {seconds}")
+            lines.extend(['# HELP app_sql_slowest_query_seconds Sentencias SQL más lentas.',
+                          '# TYPE app_sql_slowest_query_seconds gauge'])
+            for rank, (seconds, statement) in enumerate(self.slowest, 1):
+                lines.append(f"app_sql_slowest_query_seconds{label(rank=rank, statement=statement)} {seconds}")
+        for name, value in gauges.items():
+            lines.extend([f'# TYPE {name} gauge', f'{name} {0 if value is None else value}'])
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics(app)
+
+@db.event.listens_for(db.Engine, 'before_cursor_execute')
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@db.event.listens_for(db.Engine, 'after_cursor_execute')
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_started'].pop()
+    metrics.observe_query(statement, seconds)
+    if has_request_context() and 'sql_count' in g:
+        g.sql_count += 1
+        g.sql_seconds += seconds
+        if g.sql_log is not None:
+            g.sql_log.append((seconds, statement))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.sql_count = 0
+    g.sql_seconds = 0.0
+    g.sql_log = [] if app.config['SLOW_REQUEST_MS'] is not None else None
+
+@app.after_request
+def record_request(response):
+    if 'request_started' not in g:
+        return response
+    route = request.url_rule.rule if request.url_rule else 'sin_ruta'
+    if not response.is_streamed:
+        finish_request(g, route, request.method, request.full_path, response)
+        return response
+    # Exportación, importación y SSE: el cuerpo (y su SQL) se genera después
+    # de este hook, así que se mide al cerrar la respuesta
+    state, method, path = g._get_current_object(), request.method, request.full_path
+    response.call_on_close(lambda: finish_request(state, route, method, path, response))
+    return response
+
+def finish_request(state, route, method, path, response):
+    seconds = time.perf_counter() - state.request_started
+    metrics.observe_request(route, method, response.status_code,
+                            seconds, state.sql_count, state.sql_seconds)
+    threshold = app.config['SLOW_REQUEST_MS']
+    # En SSE la duración es la de la conexión, no una petición lenta
+    if threshold is not None and seconds * 1000 >= threshold and response.mimetype != 'text/event-stream':
+        slow_request_log.warning(
+            'Petición lenta %s %s: %.1f ms, %d sentencias SQL (%.1f ms)\n%s',
+            method, path, seconds * 1000, state.sql_count, state.sql_seconds * 1000,
+            '\n'.join(f'  [{q_seconds * 1000:.1f} ms] {" ".join(statement.split())}'
+                      for q_seconds, statement in state.sql_log))
+
 # --- RUTAS DE LA APLICACIÓN ---
 
 @app.route('/')
@@ -349,13 +1797,14 @@ def register():
             return redirect(url_for('register'))
             
         new_user = User(username=username, email=email, 
-                        password_hash=generate_password_hash(password, method='scrypt'))
+                        password_hash=password_hasher.hash(password))
         db.session.add(new_user)
         db.session.commit()
+        user_directory.clear()
         flash('Registro exitoso. Por favor inicia sesión.', 'success')
         return redirect(url_for('login'))
         
-    return render_template_string(register_template, base_template=base_template)
+    return render_template('register')
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -364,13 +1813,13 @@ def login():
         password = request.form.get('password')
         user = User.query.filter_by(username=username).first()
         
-        if user and check_password_hash(user.password_hash, password):
+        if user and password_hasher.check(user.password_hash, password):
             login_user(user)
             return redirect(url_for('dashboard'))
         else:
             flash('Usuario o contraseña incorrectos', 'danger')
             
-    return render_template_string(login_template, base_template=base_template)
+    return render_template('login')
 
 @app.route('/logout')
 @login_required
@@ -381,26 +1830,68 @@ def logout():
 @app.route('/dashboard')
 @login_required
 def dashboard():
+    # Los mensajes flash son de un solo uso: esa respuesta no se cachea. Sin
+    # los triggers de versión (fuera de SQLite) no hay forma de validar el ETag
+    etag = None if session.get('_flashes') or not triggers_enabled() else dashboard_etag()
+    if etag:
+        if etag in request.if_none_match:
+            response = make_response('', 304)
+            response.set_etag(etag)
+            return response
+        cached = page_cache.get(etag) if app.config['DASHBOARD_PAGE_CACHE'] else None
+        if cached is not None:
+            return etag_response(cached, etag)
+
     search_query = request.args.get('search', '')
     status_filter = request.args.get('status', '')
+    per_page = request.args.get('per_page', app.config['TASKS_PER_PAGE'], type=int)
+    per_page = max(1, min(per_page, app.config['MAX_TASKS_PER_PAGE']))
     
-    query = Task.query
+    # Cargar los asignados en la misma consulta (evita un SELECT por tarjeta)
+    query = Task.query.options(db.joinedload(Task.assignee))
     
-    # Filtrado
-    if search_query:
-        query = query.filter(Task.title.contains(search_query))
-    if status_filter:
-        query = query.filter_by(status=status_filter)
+    # Filtrado (texto completo si está disponible)
+    query, rank = filter_tasks(query, search_query, status_filter)
         
-    # Ordenar por fecha de creación descendente
-    tasks = query.order_by(Task.created_at.desc()).all()
-    all_users = User.query.all()
+    # Por relevancia si hay búsqueda, si no por fecha de creación
+    # descendente; una página a la vez
+    tasks, next_cursor, prev_cursor = paginate_tasks(
+        query, per_page,
+        after=request.args.get('after'), before=request.args.get('before'), rank=rank)
+    # Opcional: también las tareas archivadas que coincidan
+    include_archive = request.args.get('archive') == '1'
+    archived, archive_next, archive_prev = [], None, None
+    if include_archive:
+        archive_query = filter_archive(TaskArchive.query.options(db.joinedload(TaskArchive.assignee)),
+                                       search_query, status_filter)
+        archived, archive_next, archive_prev = paginate_tasks(
+            archive_query, per_page, after=request.args.get('archive_after'),
+            before=request.args.get('archive_before'), model=TaskArchive)
     
-    # Renderizamos la plantilla base dentro de la dashboard
-    final_template = dashboard_template.replace('{% extends "base" %}', base_template)
-    
-    return render_template_string(final_template, tasks=tasks, all_users=all_users, 
-                                  search_query=search_query, status_filter=status_filter)
+    html = render_template('dashboard', tasks=tasks,
+                           include_archive=include_archive, archived=archived,
+                           archive_next=archive_next, archive_prev=archive_prev,
+                           summary=task_summary(), my_summary=task_summary(current_user.id),
+                           search_query=search_query, status_filter=status_filter,
+                           per_page=per_page, next_cursor=next_cursor, prev_cursor=prev_cursor)
+    if not etag:
+        return html
+    if app.config['DASHBOARD_PAGE_CACHE']:
+        page_cache.set(etag, html)
+    return etag_response(html, etag)
+
+def etag_response(html, etag):
+    response = make_response(html)
+    response.set_etag(etag)
+    # Privada y siempre revalidada: el navegador pregunta con If-None-Match
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@app.route('/my-queue')
+@login_required
+def my_queue():
+    tasks = my_queue_tasks(current_user.id, app.config['MY_QUEUE_LIMIT'])
+    return render_template('my_queue', tasks=tasks, overdue=overdue_count(current_user.id))
 
 @app.route('/task/new', methods=['POST'])
 @login_required
@@ -413,37 +1904,88 @@ def create_task():
         title=title,
         description=description,
         user_id=assigned_user_id,
+        due_date=parse_due_date(request.form.get('due_date')),
         created_by=current_user.username
     )
     db.session.add(new_task)
     db.session.commit()
+    publish_task_event('task-created', new_task.id, new_task.status)
     flash('Tarea creada correctamente', 'success')
     return redirect(url_for('dashboard'))
 
+def get_task_or_404(task_id):
+    # La tarea y su asignado en una sola consulta (lo que necesita la tarjeta)
+    return Task.query.options(db.joinedload(Task.assignee)).filter_by(id=task_id).first_or_404()
+
+def task_to_dict(task):
+    return {'id': task.id, 'title': task.title, 'description': task.description,
+            'status': task.status, 'assignee': task.assignee.username,
+            'created_by': task.created_by,
+            'due_date': task.due_date.isoformat() if task.due_date else None}
+
+def task_response(task, message):
+    """Respuesta de una escritura sobre una tarea.
+
+    Con `X-Fragment: card` devuelve solo la tarjeta HTML y con
+    `Accept: application/json` la tarea en JSON; si no, flash y
+    redirección al tablero. Se construye antes del commit para no tener
+    que volver a leer la fila expirada.
+    """
+    if request.headers.get('X-Fragment') == 'card':
+        return render_template('task_card', task=task)
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(task_to_dict(task))
+    if message:
+        flash(message, 'success')
+    return redirect(url_for('dashboard'))
+
 @app.route('/task/edit/<int:task_id>', methods=['GET', 'POST'])
 @login_required
 def edit_task(task_id):
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_404(task_id)
     if request.method == 'POST':
         task.title = request.form.get('title')
         task.description = request.form.get('description')
-        task.status = request.form.get('status')
+        if 'due_date' in request.form:
+            task.due_date = parse_due_date(request.form['due_date'])
+        task.status = new_status = request.form.get('status')
+        response = task_response(task, 'Tarea actualizada')
         db.session.commit()
-        flash('Tarea actualizada', 'success')
-        return redirect(url_for('dashboard'))
+        publish_task_event('task-changed', task_id, new_status)
+        return response
         
-    final_template = edit_task_template.replace('{% extends "base" %}', base_template)
-    return render_template_string(final_template, task=task)
+    return render_template('edit_task', task=task)
 
 @app.route('/task/status/<int:task_id>', methods=['POST'])
 @login_required
 def update_task_status(task_id):
-    task = Task.query.get_or_404(task_id)
+    task = get_task_or_404(task_id)
     new_status = request.form.get('status')
-    if new_status:
-        task.status = new_status
-        db.session.commit()
-    return redirect(url_for('dashboard'))
+    if not new_status:
+        return task_response(task, None)
+    if app.config['COALESCE_STATUS_WRITES']:
+        status_writes.submit(task.id, new_status)
+        # Se muestra ya el estado nuevo; lo escribe el lote en segundo plano
+        with db.session.no_autoflush:
+            task.status = new_status
+            return task_response(task, None)
+    task.status = new_status
+    response = task_response(task, None)
+    db.session.commit()
+    publish_task_event('task-changed', task_id, new_status)
+    return response
+
+@app.route('/task/<int:task_id>/card')
+@login_required
+def task_card(task_id):
+    return render_template('task_card', task=get_task_or_404(task_id))
+
+@app.route('/events')
+@login_required
+def task_events():
+    # Flujo SSE con los cambios de tareas; el navegador reconecta solo
+    return Response(events.stream(events.subscribe()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/task/delete/<int:task_id>')
 @login_required
@@ -451,6 +1993,7 @@ def delete_task(task_id):
     task = Task.query.get_or_404(task_id)
     db.session.delete(task)
     db.session.commit()
+    publish_task_event('task-deleted', task_id)
     flash('Tarea eliminada', 'success')
     return redirect(url_for('dashboard'))
 
@@ -460,20 +2003,243 @@ def profile():
     if request.method == 'POST':
         new_pass = request.form.get('new_password')
         if new_pass:
-            current_user.password_hash = generate_password_hash(new_pass, method='scrypt')
+            current_user.password_hash = password_hasher.hash(new_pass)
             db.session.commit()
+            user_cache.invalidate(current_user.id)
             flash('Contraseña actualizada con éxito', 'success')
             
-    final_template = profile_template.replace('{% extends "base" %}', base_template)
-    return render_template_string(final_template)
+    return render_template('profile')
+
+# --- API JSON MASIVA ---
+
+def is_id(value):
+    # true/false de JSON llegan como bool, que en Python es subclase de int
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def json_batch():
+    # Acepta una lista o {"items": [...]}; devuelve (items, respuesta_error)
+    payload = request.get_json(silent=True)
+    if isinstance(payload, dict):
+        payload = payload.get('items')
+    if not isinstance(payload, list):
+        return None, (jsonify(error='Se esperaba una lista JSON'), 400)
+    if len(payload) > app.config['API_MAX_BATCH']:
+        return None, (jsonify(error=f"Máximo {app.config['API_MAX_BATCH']} elementos por lote"), 413)
+    return payload, None
+
+def batch_response(results, started, **counts):
+    elapsed = time.perf_counter() - started
+    return jsonify(results=results, elapsed_ms=round(elapsed * 1000, 2),
+                   tasks_per_second=round(len(results) / elapsed, 1) if elapsed else None,
+                   **counts)
+
+@app.route('/api/tasks', methods=['POST'])
+@login_required
+def api_create_tasks():
+    started = time.perf_counter()
+    items, error = json_batch()
+    if error:
+        return error
+
+    # Validar asignados con una sola consulta
+    user_ids = {item.get('user_id') for item in items
+                if isinstance(item, dict) and is_id(item.get('user_id'))}
+    known_users = set(db.session.scalars(db.select(User.id).where(User.id.in_(user_ids))))
+
+    results, rows = [None] * len(items), []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {'error': 'Elemento no es un objeto'}
+            continue
+        title = item.get('title')
+        description = item.get('description')
+        status = item.get('status', 'Pendiente')
+        if not isinstance(title, str) or not title.strip() or len(title) > 200:
+            results[index] = {'error': 'Título inválido'}
+        elif description is not None and not isinstance(description, str):
+            results[index] = {'error': 'Descripción inválida'}
+        elif not is_id(item.get('user_id')) or item['user_id'] not in known_users:
+            results[index] = {'error': 'Empleado inexistente'}
+        elif status not in TASK_STATUSES:
+            results[index] = {'error': 'Estado inválido'}
+        else:
+            rows.append((index, {'title': title, 'description': description,
+                                 'status': status, 'user_id': item['user_id'],
+                                 'created_by': current_user.username}))
+
+    if rows:
+        # INSERT masivo en una transacción; RETURNING conserva el orden de entrada
+        stmt = db.insert(Task).returning(Task.id, sort_by_parameter_order=True)
+        new_ids = db.session.scalars(stmt, [row for _, row in rows]).all()
+        db.session.commit()
+        for (index, row), task_id in zip(rows, new_ids):
+            results[index] = {'id': task_id}
+            publish_task_event('task-created', task_id, row['status'])
+
+    return batch_response(results, started, created=len(rows), errors=len(items) - len(rows))
+
+@app.route('/api/tasks/status', methods=['POST'])
+@login_required
+def api_update_statuses():
+    started = time.perf_counter()
+    items, error = json_batch()
+    if error:
+        return error
+
+    task_ids = {item.get('id') for item in items
+                if isinstance(item, dict) and is_id(item.get('id'))}
+    existing = set(db.session.scalars(db.select(Task.id).where(Task.id.in_(task_ids))))
+
+    results, changes = [], []
+    for item in items:
+        if not isinstance(item, dict) or not is_id(item.get('id')) or item['id'] not in existing:
+            results.append({'error': 'Tarea inexistente'})
+        elif item.get('status') not in TASK_STATUSES:
+            results.append({'id': item['id'], 'error': 'Estado inválido'})
+        else:
+            changes.append((item['id'], item['status']))
+            results.append({'id': item['id']})
+
+    if changes:
+        apply_status_changes(changes)
+        db.session.commit()
+        for task_id, status in changes:
+            publish_task_event('task-changed', task_id, status)
+
+    return batch_response(results, started, updated=len(changes), errors=len(items) - len(changes))
+
+@app.route('/api/users')
+@login_required
+def api_users():
+    return jsonify(users=search_users(request.args.get('q', '').strip()))
+
+@app.route('/api/stats')
+@login_required
+def api_stats():
+    return jsonify(totals=task_summary(), users=task_summary_by_user())
+
+@app.route('/export/tasks')
+@login_required
+def export_tasks():
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify(error='Formato no soportado (csv o ndjson)'), 400
+    rows = iter_export_rows(request.args.get('search', ''), request.args.get('status', ''))
+    return Response(stream_with_context(iter_export(rows, export_format)),
+                    mimetype=EXPORT_FORMATS[export_format],
+                    headers={'Content-Disposition': f'attachment; filename=tareas.{export_format}'})
+
+@app.route('/import/<kind>', methods=['POST'])
+@login_required
+def import_data(kind):
+    upload = request.files.get('file')
+    if kind not in IMPORT_KINDS or upload is None:
+        return jsonify(error='Se espera un CSV en el campo "file" para users o tasks'), 400
+    # Flask cierra los ficheros subidos al volver la vista: se copia a uno propio
+    spool = tempfile.TemporaryFile()
+    upload.save(spool)
+    spool.seek(0)
+    created_by = current_user.username
+
+    def generate():
+        # Una línea JSON por bloque importado; la última trae el informe completo
+        with io.TextIOWrapper(spool, encoding='utf-8-sig', newline='') as source:
+            for step in import_csv(kind, csv_rows(source), created_by):
+                yield json.dumps(step, ensure_ascii=False) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/stats/runtime')
+@login_required
+def runtime_stats():
+    return jsonify(user_cache=user_cache.stats(), page_cache=page_cache.stats(),
+                   user_directory=user_directory.stats(),
+                   status_writes=status_writes.stats(), events=events.stats(),
+                   periodic_jobs={name: job.stats() for name, job in periodic_jobs.items()},
+                   password_hashing=password_hasher.stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    # Sin login para que Prometheus pueda leerlo; publicarlo solo en la red interna
+    gauges = {}
+    for prefix, stats in (('app_user_cache', user_cache.stats()),
+                          ('app_page_cache', page_cache.stats()),
+                          ('app_user_directory', user_directory.stats()),
+                          ('app_password_hash', password_hasher.stats()),
+                          ('app_status_writes', status_writes.stats()),
+                          ('app_sse', events.stats())):
+        for name, value in stats.items():
+            gauges[f'{prefix}_{name}'] = value
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
 
 # --- INICIALIZACIÓN ---
 
+def init_db():
+    new_counters = not db.inspect(db.engine).has_table(TaskCounter.__tablename__)
+    db.create_all()
+    # create_all no añade índices nuevos a tablas que ya existen
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    if db.engine.dialect.name == 'sqlite':
+        init_fts()
+        with db.engine.begin() as conn:
+            for statement in COUNTER_TRIGGERS + VERSION_TRIGGERS:
+                conn.execute(db.text(statement))
+    if db.session.get(DataVersion, 1) is None:
+        db.session.add(DataVersion(id=1, version=0))
+        db.session.commit()
+    if new_counters:
+        rebuild_counters()
+
+@app.cli.command('init-db')
+def init_db_command():
+    """Crea las tablas e índices que falten."""
+    init_db()
+    print("Base de datos lista.")
+
+@app.cli.command('rebuild-counters')
+def rebuild_counters_command():
+    """Recalcula los contadores de tareas por empleado y estado."""
+    rebuild_counters()
+    print("Contadores recalculados.")
+
+@app.cli.command('archive-tasks')
+@click.option('--days', type=int, default=None, help='Antigüedad mínima (por defecto ARCHIVE_AFTER_DAYS).')
+def archive_tasks_command(days):
+    """Mueve las tareas completadas antiguas a la tabla de archivo."""
+    print(f"{archive_completed_tasks(days)} tareas archivadas.")
+
+@app.cli.command('export-tasks')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='csv')
+@click.option('--search', default='', help='Mismo filtro de texto que el tablero.')
+@click.option('--status', default='', help='Mismo filtro de estado que el tablero.')
+@click.option('--output', '-o', default='-', help='Fichero de salida (por defecto, stdout).')
+def export_tasks_command(export_format, search, status, output):
+    """Exporta las tareas en CSV o NDJSON sin cargarlas en memoria."""
+    with click.open_file(output, 'w', encoding='utf-8') as out:
+        for chunk in iter_export(iter_export_rows(search, status), export_format):
+            out.write(chunk)
+
+@app.cli.command('import-csv')
+@click.argument('kind', type=click.Choice(IMPORT_KINDS))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--created-by', default=None, help='Valor de created_by para las tareas.')
+def import_csv_command(kind, path, created_by):
+    """Importa usuarios (username,email,password) o tareas
+    (title,description,status,assignee,due_date) desde un CSV."""
+    with open(path, newline='', encoding='utf-8-sig') as source:
+        for report in import_csv(kind, csv_rows(source), created_by):
+            if not report.get('done'):
+                click.echo(f"{report['processed']} filas procesadas...", err=True)
+    for error in report['errors']:
+        click.echo(f"línea {error['line']}: {error['error']}", err=True)
+    click.echo(f"{report['imported']} importadas, {report['skipped']} omitidas "
+               f"de {report['processed']} filas.")
+
 if __name__ == '__main__':
-    # Crear la base de datos si no existe
-    if not os.path.exists('gestion_tareas.db'):
-        with app.app_context():
-            db.create_all()
-            print("Base de datos creada exitosamente.")
+    # Crear la base de datos (y los índices nuevos) si no existen
+    with app.app_context():
+        init_db()
             
     app.run(debug=True)
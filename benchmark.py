@@ -0,0 +1,304 @@
+"""Benchmarks de la aplicación de gestión de tareas.
+
+Uso:
+    python benchmark.py templates [--iterations N] [--tasks N]
+    python benchmark.py seed [--db RUTA] [--users N] [--tasks N] [--seed N] [--force]
+    python benchmark.py load [--db RUTA] [--concurrency 1,4,16] [--requests N]
+                             [--output resultados.json] [--page-cache]
+
+`templates` compara, por ruta, el coste de renderizar compilando la
+plantilla en cada petición (comportamiento anterior con
+render_template_string) frente a las plantillas registradas y
+precompiladas en el loader de la aplicación.
+
+`seed` crea un SQLite desechable con datos sintéticos reproducibles: con
+la misma semilla se generan exactamente los mismos usuarios y tareas.
+Todos los usuarios (empleado0001, empleado0002, ...) tienen la contraseña
+"benchmark".
+
+`load` lanza /login, /dashboard (sin filtros, con búsqueda y con estado),
+/task/new y /task/status/<id> con el cliente de pruebas de Flask a cada
+nivel de concurrencia y guarda p50/p95/p99 y el throughput en JSON, para
+poder comparar entre cambios.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_DB = os.path.join(tempfile.gettempdir(), 'gestion_tareas_bench.db')
+BENCH_PASSWORD = 'benchmark'
+
+WORDS = ('extrusora', 'inyectora', 'molde', 'pellets', 'reciclado', 'granulado', 'lavado',
+         'tolva', 'silo', 'bobina', 'film', 'PET', 'polietileno', 'inventario', 'calidad',
+         'mantenimiento', 'limpieza', 'turno', 'línea', 'compresor', 'secador', 'etiquetado')
+VERBS = ('Revisar', 'Limpiar', 'Calibrar', 'Reponer', 'Inspeccionar', 'Registrar', 'Ajustar')
+
+def load_app(db_path):
+    # DATABASE_URL debe fijarse antes de importar la aplicación
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(db_path)}'
+    import app as gestion
+    return gestion
+
+# --- PLANTILLAS ---
+
+# Contexto de cada ruta, equivalente al que pasan las vistas
+def template_contexts(gestion, n_tasks):
+    user = gestion.User(id=1, username='empleado', email='empleado@example.com')
+    summary = {'Pendiente': n_tasks // 2, 'En Progreso': 0, 'Completada': n_tasks - n_tasks // 2,
+               'Vencidas': 0}
+    tasks = [gestion.Task(id=i, title=f'Tarea {i}', description='Revisar línea de extrusión',
+                          status='Pendiente' if i % 2 else 'Completada',
+                          created_at=datetime(2024, 1, 1), assignee=user, created_by='jefe')
+             for i in range(1, n_tasks + 1)]
+    return {
+        'login': {},
+        'register': {},
+        'dashboard': dict(tasks=tasks, search_query='', status_filter='',
+                          per_page=n_tasks, next_cursor=None, prev_cursor=None,
+                          summary=summary, my_summary=summary, include_archive=False,
+                          archived=[], archive_next=None, archive_prev=None),
+        'edit_task': dict(task=tasks[0]),
+        'profile': {},
+    }
+
+def time_per_call(fn, iterations):
+    fn()  # calentamiento
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def bench_templates(gestion, iterations, n_tasks):
+    from flask import render_template
+    app = gestion.app
+    def render_uncached(name, ctx):
+        # Entorno con caché vacía en cada llamada: la plantilla, la base y
+        # los include se compilan una vez por petición, como hacía
+        # render_template_string
+        request_env = app.jinja_env.overlay(cache_size=50)
+        ctx = dict(ctx)
+        app.update_template_context(ctx)
+        return request_env.from_string(gestion.TEMPLATES[name]).render(ctx)
+
+    results = {}
+    with app.test_request_context('/'):
+        for name, ctx in template_contexts(gestion, n_tasks).items():
+            before = time_per_call(lambda: render_uncached(name, ctx), iterations)
+            after = time_per_call(lambda: render_template(name, **ctx), iterations)
+            results[name] = {
+                'before_us': round(before, 1),
+                'after_us': round(after, 1),
+                'speedup': round(before / after, 2),
+            }
+    return results
+
+# --- DATOS SINTÉTICOS ---
+
+def seed_database(gestion, n_users, n_tasks, seed, chunk_size=10000):
+    rng = random.Random(seed)
+    db, User, Task = gestion.db, gestion.User, gestion.Task
+    # Un único hash compartido: el login sigue pagando scrypt, la siembra no
+    password_hash = gestion.password_hasher.hash(BENCH_PASSWORD)
+    now = datetime(2024, 6, 1)
+
+    with gestion.app.app_context():
+        gestion.init_db()
+        db.session.execute(db.insert(User), [
+            {'username': f'empleado{i:04d}', 'email': f'empleado{i:04d}@plasticos.example',
+             'password_hash': password_hash}
+            for i in range(1, n_users + 1)])
+        db.session.commit()
+
+        for start in range(0, n_tasks, chunk_size):
+            rows = []
+            for _ in range(min(chunk_size, n_tasks - start)):
+                created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+                due = created_at.date() + timedelta(days=rng.randrange(1, 30)) if rng.random() < 0.6 else None
+                rows.append({
+                    'title': f'{rng.choice(VERBS)} {rng.choice(WORDS)} {rng.choice(WORDS)}',
+                    'description': ' '.join(rng.choices(WORDS, k=rng.randrange(4, 16))),
+                    'status': rng.choices(gestion.TASK_STATUSES, weights=(5, 1, 4))[0],
+                    'created_at': created_at,
+                    'due_date': due,
+                    'user_id': rng.randrange(1, n_users + 1),
+                    'created_by': f'empleado{rng.randrange(1, n_users + 1):04d}',
+                })
+            db.session.execute(db.insert(Task), rows)
+            db.session.commit()
+            print(f'{start + len(rows)}/{n_tasks} tareas', flush=True)
+
+# --- CARGA ---
+
+def percentile(sorted_values, pct):
+    # Rango más cercano sobre una lista ya ordenada
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def scenarios(n_tasks):
+    # nombre -> función (cliente, rng, usuario) que devuelve (respuesta, código esperado)
+    return {
+        'login': lambda c, rng, user: (c.post('/login', data={'username': user, 'password': BENCH_PASSWORD}), 302),
+        'dashboard': lambda c, rng, user: (c.get('/dashboard'), 200),
+        'dashboard_search': lambda c, rng, user: (c.get(f'/dashboard?search={rng.choice(WORDS)}'), 200),
+        'dashboard_status': lambda c, rng, user: (c.get('/dashboard?status=Pendiente'), 200),
+        'task_new': lambda c, rng, user: (c.post('/task/new', data={
+            'title': f'{rng.choice(VERBS)} {rng.choice(WORDS)}', 'description': 'benchmark',
+            'user_id': 1}), 302),
+        'task_status': lambda c, rng, user: (c.post(f'/task/status/{rng.randrange(1, n_tasks + 1)}', data={
+            'status': rng.choice(('Pendiente', 'Completada'))}), 302),
+        'user_search': lambda c, rng, user: (c.get(f'/api/users?q=empleado{rng.randrange(10)}'), 200),
+    }
+
+def run_level(gestion, name, action, concurrency, n_requests, seed):
+    app = gestion.app
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    per_worker = [n_requests // concurrency + (i < n_requests % concurrency) for i in range(concurrency)]
+
+    def worker(index, count):
+        rng = random.Random(f'{seed}-{name}-{concurrency}-{index}')
+        user = f'empleado{index + 1:04d}'
+        client = app.test_client()
+        client.post('/login', data={'username': user, 'password': BENCH_PASSWORD})
+        barrier.wait()
+        local, failed = [], 0
+        for _ in range(count):
+            started = time.perf_counter()
+            response, expected = action(client, rng, user)
+            local.append(time.perf_counter() - started)
+            failed += response.status_code != expected
+            response.close()
+            # Los flash se acumularían en la cookie de sesión
+            with client.session_transaction() as sess:
+                sess.pop('_flashes', None)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    barrier = threading.Barrier(concurrency + 1)
+    threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(per_worker)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': errors[0],
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'mean_ms': ms(sum(latencies) / len(latencies)) if latencies else None,
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+    }
+
+def bench_load(gestion, levels, n_requests, seed, only=None):
+    app = gestion.app
+    app.config['TESTING'] = True
+    # El archivado reescribiría el conjunto sembrado mientras se mide
+    app.config['ARCHIVE_INTERVAL_SECONDS'] = None
+    with app.app_context():
+        n_users = gestion.db.session.scalar(gestion.db.select(gestion.db.func.count(gestion.User.id)))
+        n_tasks = gestion.db.session.scalar(gestion.db.select(gestion.db.func.max(gestion.Task.id))) or 0
+    if n_users < max(levels):
+        raise SystemExit(f'La base tiene {n_users} usuarios; hacen falta al menos {max(levels)}.')
+
+    results = []
+    for name, action in scenarios(n_tasks).items():
+        if only and name not in only:
+            continue
+        for concurrency in levels:
+            result = run_level(gestion, name, action, concurrency, n_requests, seed)
+            results.append(result)
+            print(f"{name:<18} c={concurrency:<3} p50={result['p50_ms']}ms p95={result['p95_ms']}ms "
+                  f"p99={result['p99_ms']}ms {result['throughput_rps']} req/s errores={result['errors']}",
+                  flush=True)
+    return {'users': n_users, 'tasks': n_tasks, 'results': results}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    tpl = sub.add_parser('templates', help='render por ruta: compilado por petición vs. precompilado')
+    tpl.add_argument('--iterations', type=int, default=200)
+    tpl.add_argument('--tasks', type=int, default=24, help='tarjetas en el tablero')
+
+    seed = sub.add_parser('seed', help='genera un SQLite con datos sintéticos')
+    seed.add_argument('--db', default=DEFAULT_DB)
+    seed.add_argument('--users', type=int, default=1000)
+    seed.add_argument('--tasks', type=int, default=200000)
+    seed.add_argument('--seed', type=int, default=42)
+    seed.add_argument('--force', action='store_true', help='sobrescribir la base si existe')
+
+    load = sub.add_parser('load', help='mide latencia y throughput por ruta y concurrencia')
+    load.add_argument('--db', default=DEFAULT_DB)
+    load.add_argument('--concurrency', default='1,4,16', help='niveles separados por comas')
+    load.add_argument('--requests', type=int, default=200, help='peticiones por escenario y nivel')
+    load.add_argument('--scenarios', default=None, help='subconjunto separado por comas')
+    load.add_argument('--seed', type=int, default=42)
+    load.add_argument('--output', default='benchmark_results.json')
+    load.add_argument('--page-cache', action='store_true',
+                      help='mantener la caché de páginas del tablero (por defecto se desactiva)')
+    args = parser.parse_args()
+
+    if args.command == 'templates':
+        gestion = load_app(DEFAULT_DB)
+        results = bench_templates(gestion, args.iterations, args.tasks)
+        print(f"{'ruta':<12}{'antes (µs)':>14}{'después (µs)':>16}{'mejora':>10}")
+        for name, r in results.items():
+            print(f"{name:<12}{r['before_us']:>14}{r['after_us']:>16}{r['speedup']:>9}x")
+        print(json.dumps(results))
+
+    elif args.command == 'seed':
+        if os.path.exists(args.db):
+            if not args.force:
+                raise SystemExit(f'{args.db} ya existe; usa --force para sobrescribirla.')
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(args.db + suffix):
+                    os.remove(args.db + suffix)
+        started = time.perf_counter()
+        seed_database(load_app(args.db), args.users, args.tasks, args.seed)
+        print(f'{args.db}: {args.users} usuarios, {args.tasks} tareas '
+              f'en {time.perf_counter() - started:.1f} s')
+
+    elif args.command == 'load':
+        if not os.path.exists(args.db):
+            raise SystemExit(f'{args.db} no existe; genera los datos con "seed" primero.')
+        gestion = load_app(args.db)
+        gestion.app.config['DASHBOARD_PAGE_CACHE'] = args.page_cache
+        levels = [int(level) for level in args.concurrency.split(',')]
+        only = set(args.scenarios.split(',')) if args.scenarios else None
+        report = bench_load(gestion, levels, args.requests, args.seed, only)
+        report['meta'] = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'db': os.path.abspath(args.db),
+            'requests_per_level': args.requests,
+            'page_cache': args.page_cache,
+            'seed': args.seed,
+        }
+        with open(args.output, 'w', encoding='utf-8') as out:
+            json.dump(report, out, indent=2, ensure_ascii=False)
+        print(f'Resultados en {args.output}')
+
+if __name__ == '__main__':
+    main()
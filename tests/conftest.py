@@ -0,0 +1,50 @@
+import itertools
+import os
+import sys
+import tempfile
+
+import pytest
+
+# La aplicación lee DATABASE_URL al importarse: base de datos temporal propia
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as gestion  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    gestion.app.config['TESTING'] = True
+    with gestion.app.app_context():
+        gestion.init_db()
+    return gestion.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(client, username, password='secreto'):
+    return client.post('/register', data={'username': username, 'email': f'{username}@example.com',
+                                          'password': password})
+
+
+def login(client, username, password='secreto'):
+    return client.post('/login', data={'username': username, 'password': password})
+
+
+_usernames = (f'empleado{n}' for n in itertools.count(1))
+
+
+@pytest.fixture
+def user_client(client):
+    # Cliente con sesión iniciada; un usuario nuevo por test
+    username = next(_usernames)
+    register(client, username)
+    login(client, username)
+    client.username = username
+    with client.application.app_context():
+        client.user_id = gestion.User.query.filter_by(username=username).one().id
+    return client
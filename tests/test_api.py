@@ -0,0 +1,28 @@
+import app as gestion
+
+
+def test_create_tasks_rejects_bad_items_without_losing_the_batch(user_client):
+    response = user_client.post('/api/tasks', json=[
+        {'title': 'válida', 'user_id': user_client.user_id, 'description': 'texto'},
+        {'title': 'lista', 'user_id': user_client.user_id, 'description': ['x']},
+        {'title': 'booleano', 'user_id': True},
+        {'title': 'sin descripción', 'user_id': user_client.user_id},
+    ])
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert 'id' in results[0] and 'id' in results[3]
+    assert results[1] == {'error': 'Descripción inválida'}
+    assert results[2] == {'error': 'Empleado inexistente'}
+
+
+def test_update_statuses_rejects_boolean_ids(user_client):
+    with gestion.app.app_context():
+        task = gestion.Task(title='primera', user_id=user_client.user_id)
+        gestion.db.session.add(task)
+        gestion.db.session.commit()
+        task_id = task.id
+
+    response = user_client.post('/api/tasks/status', json=[
+        {'id': True, 'status': 'Completada'}, {'id': task_id, 'status': 'Completada'}])
+    results = response.get_json()['results']
+    assert results == [{'error': 'Tarea inexistente'}, {'id': task_id}]
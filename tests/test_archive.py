@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta
+
+import app as gestion
+
+
+def test_archive_job_is_opt_in(client):
+    client.get('/login')
+    assert gestion.app.config['ARCHIVE_INTERVAL_SECONDS'] is None
+    assert gestion.periodic_jobs['archive']._thread is None
+    assert gestion.periodic_jobs['archive'].stats()['enabled'] is False
+
+
+def test_archive_moves_only_old_completed_tasks(user_client):
+    old = datetime.utcnow() - timedelta(days=gestion.app.config['ARCHIVE_AFTER_DAYS'] + 1)
+    with gestion.app.app_context():
+        tasks = [gestion.Task(title='vieja hecha', status='Completada', created_at=old, user_id=user_client.user_id),
+                 gestion.Task(title='vieja pendiente', status='Pendiente', created_at=old, user_id=user_client.user_id),
+                 gestion.Task(title='nueva hecha', status='Completada', user_id=user_client.user_id)]
+        gestion.db.session.add_all(tasks)
+        gestion.db.session.commit()
+        ids = [task.id for task in tasks]
+
+        assert gestion.archive_completed_tasks() >= 1
+        remaining = set(gestion.db.session.scalars(gestion.db.select(gestion.Task.id).where(gestion.Task.id.in_(ids))))
+        assert remaining == set(ids[1:])
+        archived = gestion.TaskArchive.query.filter_by(task_id=ids[0]).one()
+        assert archived.title == 'vieja hecha'
+        assert gestion.task_summary(user_client.user_id)['Completada'] == 2
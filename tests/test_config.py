@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IN_MEMORY_SMOKE = """
+import app as gestion
+with gestion.app.app_context():
+    gestion.init_db()
+client = gestion.app.test_client()
+client.post('/register', data={'username': 'ana', 'email': 'ana@example.com', 'password': 'secreto'})
+client.post('/login', data={'username': 'ana', 'password': 'secreto'})
+assert client.get('/dashboard').status_code == 200
+"""
+
+
+def test_in_memory_sqlite_starts():
+    # Sin opciones de tamaño de pool: StaticPool no las admite
+    env = dict(os.environ, DATABASE_URL='sqlite://')
+    result = subprocess.run([sys.executable, '-c', IN_MEMORY_SMOKE], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+
+import app as gestion
+
+
+@pytest.fixture
+def count_statements(app):
+    # Solo las sentencias del hilo de la petición, no las de tareas de fondo
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = gestion.db.engine
+    gestion.db.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    app.config['DASHBOARD_PAGE_CACHE'] = False
+    yield statements
+    app.config['DASHBOARD_PAGE_CACHE'] = True
+    gestion.db.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def seed_tasks(n_users, n_tasks):
+    # Muchos asignados distintos: un acceso perezoso por tarjeta se notaría
+    with gestion.app.app_context():
+        users = [{'username': f'carga{n}', 'email': f'carga{n}@example.com', 'password_hash': '-'}
+                 for n in range(n_users)]
+        user_ids = gestion.db.session.scalars(
+            gestion.db.insert(gestion.User).returning(gestion.User.id), users).all()
+        gestion.db.session.execute(gestion.db.insert(gestion.Task), [
+            {'title': f'tarea {n}', 'user_id': user_ids[n % n_users]} for n in range(n_tasks)])
+        gestion.db.session.commit()
+
+
+def dashboard_statements(client, statements, url):
+    del statements[:]
+    assert client.get(url).status_code == 200
+    return len(statements)
+
+
+def test_dashboard_query_count_does_not_depend_on_page_size(user_client, count_statements):
+    seed_tasks(n_users=100, n_tasks=10000)
+    user_client.get('/dashboard')  # consume el flash del login y calienta las cachés
+
+    small = dashboard_statements(user_client, count_statements, '/dashboard?per_page=10')
+    large = dashboard_statements(user_client, count_statements,
+                                 f"/dashboard?per_page={gestion.app.config['MAX_TASKS_PER_PAGE']}")
+    filtered = dashboard_statements(user_client, count_statements,
+                                    f"/dashboard?status=Pendiente&per_page={gestion.app.config['MAX_TASKS_PER_PAGE']}")
+    assert small == large == filtered
+    assert small <= 5
@@ -0,0 +1,47 @@
+from datetime import date, timedelta
+
+import app as gestion
+
+
+def test_dashboard_not_modified_until_data_changes(user_client):
+    user_client.get('/dashboard')  # consume el flash del login (sin ETag)
+    etag = user_client.get('/dashboard').headers['ETag']
+    assert user_client.get('/dashboard', headers={'If-None-Match': etag}).status_code == 304
+
+    user_client.post('/task/new', data={'title': 'nueva', 'user_id': user_client.user_id})
+    assert user_client.get('/dashboard', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_overdue_refresh_changes_etag(user_client):
+    user_client.get('/dashboard')
+    with gestion.app.app_context():
+        gestion.db.session.add(gestion.Task(title='atrasada', user_id=user_client.user_id,
+                                            due_date=date.today() - timedelta(days=1)))
+        gestion.db.session.commit()
+        # El tablero se renderiza con las vencidas de la última actualización
+        gestion.overdue_counts['by_user'].pop(user_client.user_id, None)
+    stale = user_client.get('/dashboard')
+
+    with gestion.app.app_context():
+        gestion.refresh_overdue_counts()
+    fresh = user_client.get('/dashboard', headers={'If-None-Match': stale.headers['ETag']})
+    assert fresh.status_code == 200
+    assert fresh.headers['ETag'] != stale.headers['ETag']
+
+
+def test_without_version_triggers_dashboard_is_not_cached(user_client, monkeypatch):
+    user_client.get('/dashboard')
+    monkeypatch.setattr(gestion, 'triggers_enabled', lambda: False)
+    response = user_client.get('/dashboard', headers={'If-None-Match': '*'})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+def test_summary_without_counter_triggers_matches_counters(user_client, monkeypatch):
+    user_client.post('/task/new', data={'title': 'contada', 'user_id': user_client.user_id})
+    with gestion.app.app_context():
+        expected = gestion.task_summary(), gestion.task_summary(user_client.user_id)
+        by_user = sorted(gestion.task_summary_by_user(), key=lambda entry: entry['user_id'])
+        monkeypatch.setattr(gestion, 'triggers_enabled', lambda: False)
+        assert (gestion.task_summary(), gestion.task_summary(user_client.user_id)) == expected
+        assert sorted(gestion.task_summary_by_user(), key=lambda entry: entry['user_id']) == by_user
@@ -0,0 +1,30 @@
+import threading
+
+import app as gestion
+
+
+def test_fts_export_runs_a_single_match(user_client, monkeypatch):
+    with gestion.app.app_context():
+        gestion.db.session.execute(gestion.db.insert(gestion.Task), [
+            {'title': f'exportable {n}' if n % 2 else f'otra {n}', 'user_id': user_client.user_id}
+            for n in range(50)])
+        gestion.db.session.commit()
+    monkeypatch.setitem(gestion.app.config, 'EXPORT_CHUNK_SIZE', 5)
+
+    statements = []
+    thread = threading.get_ident()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if threading.get_ident() == thread:
+            statements.append(statement)
+
+    with gestion.app.app_context():
+        engine = gestion.db.engine
+        gestion.db.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            ids = [row.id for row in gestion.iter_export_rows('exportable')]
+        finally:
+            gestion.db.event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert len(ids) == 25 and ids == sorted(ids)
+    assert sum('MATCH' in statement for statement in statements) == 1
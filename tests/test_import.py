@@ -0,0 +1,63 @@
+import io
+
+import app as gestion
+
+
+def run_import(kind, text):
+    with gestion.app.app_context():
+        return list(gestion.import_csv(kind, gestion.csv_rows(io.StringIO(text)), 'tests'))[-1]
+
+
+def test_import_tasks_reports_each_row_once(user_client):
+    report = run_import('tasks', 'title,assignee\n'
+                                 f'importada,{user_client.username}\n'
+                                 ',nadie\n'
+                                 'huérfana,no-existe\n')
+    assert report['done']
+    assert (report['processed'], report['imported'], report['skipped']) == (3, 1, 2)
+    assert [error['line'] for error in report['errors']] == [3, 4]
+
+
+def test_discarded_chunk_does_not_count_rejected_rows_twice(user_client, monkeypatch):
+    original = gestion.import_tasks_chunk
+
+    def chunk_with_broken_row(*args):
+        valid = original(*args)
+        valid[-1][1]['title'] = None  # NOT NULL: el INSERT del bloque falla
+        return valid
+
+    monkeypatch.setattr(gestion, 'import_tasks_chunk', chunk_with_broken_row)
+    report = run_import('tasks', 'title,assignee\n'
+                                 ',nadie\n'
+                                 f'rota,{user_client.username}\n')
+    assert (report['processed'], report['imported'], report['skipped']) == (2, 0, 2)
+    assert [error['line'] for error in report['errors']] == [2, 3]
+    assert report['errors'][1]['error'].startswith('bloque descartado')
+
+
+def test_import_users_hashes_through_the_shared_pool(app):
+    report = run_import('users', 'username,email,password\n'
+                                 'importado1,importado1@example.com,secreto1\n'
+                                 'importado2,importado2@example.com,secreto2\n')
+    assert (report['imported'], report['skipped']) == (2, 0)
+    with app.app_context():
+        user = gestion.User.query.filter_by(username='importado2').one()
+        assert gestion.password_hasher.check(user.password_hash, 'secreto2')
+
+
+def test_busy_hash_pool_skips_rows_instead_of_aborting(monkeypatch):
+    hash_async = gestion.password_hasher.hash_async
+
+    def busy_for_one(password):
+        if password == 'ocupado':
+            raise gestion.HashPoolBusy()
+        return hash_async(password)
+
+    monkeypatch.setattr(gestion.password_hasher, 'hash_async', busy_for_one)
+    report = run_import('users', 'username,email,password\n'
+                                 'libre1,libre1@example.com,secreto1\n'
+                                 'saturado,saturado@example.com,ocupado\n'
+                                 'libre2,libre2@example.com,secreto2\n')
+    assert report['done']
+    assert (report['processed'], report['imported'], report['skipped']) == (3, 2, 1)
+    assert report['errors'][0]['line'] == 3
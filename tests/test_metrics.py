@@ -0,0 +1,21 @@
+import app as gestion
+
+
+def test_streamed_export_is_measured_when_the_body_finishes(user_client, monkeypatch):
+    with gestion.app.app_context():
+        gestion.db.session.execute(gestion.db.insert(gestion.Task), [
+            {'title': f'medida {n}', 'user_id': user_client.user_id} for n in range(30)])
+        gestion.db.session.commit()
+    monkeypatch.setitem(gestion.app.config, 'EXPORT_CHUNK_SIZE', 5)
+    observed = []
+    monkeypatch.setattr(gestion.metrics, 'observe_request', lambda *args: observed.append(args))
+
+    response = user_client.get('/export/tasks')
+    assert observed == []  # todavía no se ha generado el cuerpo
+    response.get_data()
+    response.close()
+
+    (route, method, status, seconds, sql_count, sql_seconds), = observed
+    assert (route, method, status) == ('/export/tasks', 'GET', 200)
+    # Al menos un SELECT por bloque de la exportación
+    assert sql_count >= 30 // 5
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+import app as gestion
+
+
+def create_tasks(user_id, n):
+    with gestion.app.app_context():
+        tasks = [gestion.Task(title=f'agrupada {i}', user_id=user_id) for i in range(n)]
+        gestion.db.session.add_all(tasks)
+        gestion.db.session.commit()
+        return [task.id for task in tasks]
+
+
+def stored_status(task_id, timeout=2.0):
+    # Espera a que el hilo de fondo escriba el cambio
+    deadline = time.monotonic() + timeout
+    while True:
+        with gestion.app.app_context():
+            status = gestion.db.session.get(gestion.Task, task_id).status
+        if status == 'Completada' or time.monotonic() > deadline:
+            return status
+        time.sleep(0.02)
+
+
+def test_coalesced_toggles_apart_in_time_are_all_written(user_client, monkeypatch):
+    monkeypatch.setitem(gestion.app.config, 'COALESCE_STATUS_WRITES', True)
+    first, second = create_tasks(user_client.user_id, 2)
+
+    user_client.post(f'/task/status/{first}', data={'status': 'Completada'})
+    assert stored_status(first) == 'Completada'
+    time.sleep(gestion.app.config['COALESCE_MAX_DELAY'] * 4)
+    user_client.post(f'/task/status/{second}', data={'status': 'Completada'})
+    assert stored_status(second) == 'Completada'
+    assert gestion.status_writes.stats()['pending'] == 0
+
+
+def test_failed_batch_is_requeued(user_client, monkeypatch):
+    (task_id,) = create_tasks(user_client.user_id, 1)
+    coalescer = gestion.StatusWriteCoalescer(gestion.app)
+    coalescer._pending = {task_id: 'Completada'}
+
+    def broken(changes):
+        raise gestion.db.exc.OperationalError('UPDATE', {}, Exception('database is locked'))
+
+    monkeypatch.setattr(gestion, 'apply_status_changes', broken)
+    with pytest.raises(gestion.db.exc.OperationalError):
+        coalescer.flush()
+    assert coalescer.stats()['pending'] == 1 and coalescer.failures == 1
+
+    monkeypatch.undo()
+    coalescer.flush()
+    assert stored_status(task_id, timeout=0) == 'Completada'
+    assert coalescer.stats()['pending'] == 0
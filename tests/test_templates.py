@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from flask import render_template
+
+from app import app, Task, User
+
+HTML_TITLE = '<script>alert(1)</script>'
+
+
+def make_task():
+    # Sin base de datos: las plantillas solo leen atributos
+    return Task(id=1, title=HTML_TITLE, description='<img src=x>', status='Pendiente',
+                created_at=datetime(2024, 1, 1), created_by='<b>jefe</b>',
+                assignee=User(id=1, username='<i>empleado</i>', email='empleado@example.com'))
+
+
+def render(name, **context):
+    with app.test_request_context('/'):
+        return render_template(name, **context)
+
+
+def test_edit_form_escapes_task_fields():
+    html = render('edit_task', task=make_task())
+    assert HTML_TITLE not in html and '<img src=x>' not in html
+    assert '&lt;script&gt;alert(1)&lt;/script&gt;' in html
+
+
+def test_task_card_escapes_task_fields():
+    # La misma tarjeta se incluye en el tablero y se sirve como fragmento
+    html = render('task_card', task=make_task())
+    for raw in (HTML_TITLE, '<img src=x>', '<b>jefe</b>', '<i>empleado</i>'):
+        assert raw not in html
+    assert '&lt;i&gt;empleado&lt;/i&gt;' in html